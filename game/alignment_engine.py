@@ -0,0 +1,310 @@
+import math
+import unicodedata
+
+from sequence_alignment import PreparedTarget, ScalarTarget
+
+# Alinhamento com pesos: Needleman-Wunsch (global) e Smith-Waterman
+# (local), com lacunas afins de Gotoh. A pontuação é maximizada: cada par
+# de letras vale o que a matriz de substituição disser e uma lacuna de k
+# letras vale gap_open + (k - 1) * gap_extend.
+#
+# Um AlignmentEngine tem a mesma cara de uma entrada de METRICS (prepare,
+# distance, reference, engines), então pode ser passado como metric para
+# score_alignment, get_feedback e IncrementalScorer. A "distância" é o
+# quanto falta para a similaridade 1, na escala do tamanho da frase:
+# (1 - similaridade) * L, e pode ser fracionária.
+
+def base_letter(char):
+    # Letra sem acento: "é" -> "e", "Ç" -> "C"
+    decomposed = unicodedata.normalize("NFD", char)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)) or char
+
+class Scoring:
+    # Matriz de substituição e lacunas. accent e case são as notas de
+    # letras que só diferem no acento ("e"/"é") ou na caixa ("a"/"A");
+    # None trata esses pares como letras diferentes. pairs fixa a nota de
+    # pares específicos e vale nos dois sentidos.
+    def __init__(self, match=1.0, mismatch=0.0, accent=None, case=None,
+                 gap_open=-0.5, gap_extend=-0.5, pairs=None):
+        if gap_open > gap_extend:
+            raise ValueError("gap_open deve ser menor ou igual a gap_extend")
+        if match <= 0:
+            raise ValueError("match deve ser positivo")
+        self.match = match
+        self.mismatch = mismatch
+        self.accent = accent
+        self.case = case
+        self.gap_open = gap_open
+        self.gap_extend = gap_extend
+        self.pairs = {}
+        for (a, b), value in (pairs or {}).items():
+            self.pairs[(a, b)] = self.pairs[(b, a)] = value
+        self.cache = {}
+
+    def score(self, a, b):
+        key = (a, b)
+        value = self.cache.get(key)
+        if value is None:
+            value = self.cache[key] = self._score(a, b)
+        return value
+
+    def _score(self, a, b):
+        if (a, b) in self.pairs:
+            return self.pairs[(a, b)]
+        if a == b:
+            return self.match
+        partial = self.mismatch
+        if self.case is not None and a.lower() == b.lower():
+            partial = max(partial, self.case)
+        if self.accent is not None and base_letter(a) == base_letter(b):
+            partial = max(partial, self.accent)
+        if (self.accent is not None and self.case is not None
+                and base_letter(a).lower() == base_letter(b).lower()):
+            partial = max(partial, min(self.accent, self.case))
+        return partial
+
+    def matrix(self, target, alphabet):
+        # Notas de cada letra do alvo contra cada letra do alfabeto do lote
+        import numpy as np
+
+        return np.array([[self.score(a, b) for b in alphabet] for a in target], dtype=np.float64).reshape(
+            len(target), len(alphabet))
+
+    def unit_fold(self):
+        # Com match 1, mismatch 0 e lacunas de -0.5, a nota global é
+        # (m + n) / 2 - Levenshtein, então dá para usar o núcleo
+        # bit-paralelo. Devolve a função que normaliza as letras antes
+        # (tirando acento e/ou caixa quando essas notas são 1), ou None.
+        if self.pairs or (self.match, self.mismatch, self.gap_open, self.gap_extend) != (1.0, 0.0, -0.5, -0.5):
+            return None
+        if self.accent not in (None, 0.0, 1.0) or self.case not in (None, 0.0, 1.0):
+            return None
+        fold_accent = self.accent == 1.0
+        fold_case = self.case == 1.0
+
+        def fold(text):
+            if fold_accent:
+                text = "".join(base_letter(char) for char in text)
+            if fold_case:
+                text = text.lower()
+            return text
+        return fold
+
+def gotoh_score(target, current, scoring, local=False):
+    # Só a nota, em espaço linear: uma coluna por caractere de current
+    # com as linhas H (melhor nota), E (lacuna no alvo) e F (lacuna em
+    # current) sobre as posições do alvo.
+    m = len(target)
+    gap_open, gap_extend = scoring.gap_open, scoring.gap_extend
+    floor = 0.0 if local else -math.inf
+
+    previous = [0.0] * (m + 1)
+    if not local:
+        for i in range(1, m + 1):
+            previous[i] = gap_open + (i - 1) * gap_extend
+    horizontal = [-math.inf] * (m + 1)
+    current_column = [0.0] * (m + 1)
+    best = max(previous) if local else None
+
+    for j, char in enumerate(current, 1):
+        current_column[0] = 0.0 if local else gap_open + (j - 1) * gap_extend
+        horizontal[0] = current_column[0]
+        vertical = -math.inf
+        for i in range(1, m + 1):
+            horizontal[i] = max(previous[i] + gap_open, horizontal[i] + gap_extend)
+            vertical = max(current_column[i - 1] + gap_open, vertical + gap_extend)
+            current_column[i] = max(
+                previous[i - 1] + scoring.score(target[i - 1], char),
+                horizontal[i],
+                vertical,
+                floor
+            )
+        if local:
+            best = max(best, max(current_column))
+        previous, current_column = current_column, previous
+
+    return best if local else previous[m]
+
+def reference_score(target, current, scoring, local=False):
+    # Gotoh com as três matrizes completas, para o teste diferencial
+    m, n = len(target), len(current)
+    gap_open, gap_extend = scoring.gap_open, scoring.gap_extend
+    infinity = -math.inf
+    best_matrix = [[infinity] * (n + 1) for _ in range(m + 1)]
+    gap_target = [[infinity] * (n + 1) for _ in range(m + 1)]
+    gap_current = [[infinity] * (n + 1) for _ in range(m + 1)]
+
+    best_matrix[0][0] = 0.0
+    for i in range(1, m + 1):
+        gap_current[i][0] = gap_open + (i - 1) * gap_extend
+        best_matrix[i][0] = 0.0 if local else gap_current[i][0]
+    for j in range(1, n + 1):
+        gap_target[0][j] = gap_open + (j - 1) * gap_extend
+        best_matrix[0][j] = 0.0 if local else gap_target[0][j]
+
+    best = 0.0
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            gap_target[i][j] = max(best_matrix[i][j - 1] + gap_open, gap_target[i][j - 1] + gap_extend)
+            gap_current[i][j] = max(best_matrix[i - 1][j] + gap_open, gap_current[i - 1][j] + gap_extend)
+            best_matrix[i][j] = max(
+                best_matrix[i - 1][j - 1] + scoring.score(target[i - 1], current[j - 1]),
+                gap_target[i][j],
+                gap_current[i][j]
+            )
+            if local:
+                best_matrix[i][j] = max(best_matrix[i][j], 0.0)
+                best = max(best, best_matrix[i][j])
+
+    return best if local else best_matrix[m][n]
+
+def batch_score(target, candidates, scoring, local=False):
+    # Mesmo esquema de batch_distance: uma coluna por caractere para todo
+    # o lote. A lacuna vertical F[i] = max(H[i - 1] + abre, F[i - 1] +
+    # estende) vira um máximo acumulado, porque com abre <= estende abrir
+    # de novo nunca ganha de estender:
+    #   F[i] = abre + (i - 1) * estende + max(D[k] - k * estende), k < i
+    # onde D é a melhor nota sem lacuna vertical no fim.
+    import numpy as np
+
+    candidates = list(candidates)
+    count = len(candidates)
+    m = len(target)
+    gap_open, gap_extend = scoring.gap_open, scoring.gap_extend
+
+    lengths = np.fromiter(map(len, candidates), dtype=np.int64, count=count)
+    width = int(lengths.max()) if count else 0
+    alphabet = sorted(set(target).union(*candidates)) if count else sorted(set(target))
+    index = {char: k for k, char in enumerate(alphabet)}
+    scores = np.full((m, len(alphabet) + 1), -np.inf)
+    scores[:, :-1] = scoring.matrix(target, alphabet)
+
+    # Posições além do fim de cada candidato apontam para a coluna -inf
+    codes = np.full((count, width), len(alphabet), dtype=np.int64)
+    for row, candidate in enumerate(candidates):
+        codes[row, :len(candidate)] = [index[char] for char in candidate]
+
+    positions = np.arange(m + 1)
+    vertical_offsets = gap_open + (positions[1:] - 1) * gap_extend
+
+    column = np.zeros((count, m + 1))
+    if not local:
+        column[:, 1:] = vertical_offsets
+    horizontal = np.full((count, m + 1), -np.inf)
+    finals = np.full(count, column[0, m] if count else 0.0)
+    best = column.max(axis=1) if local else None
+
+    for j in range(1, width + 1):
+        horizontal = np.maximum(column + gap_open, horizontal + gap_extend)
+        diagonal = np.empty_like(column)
+        diagonal[:, 0] = 0.0 if local else gap_open + (j - 1) * gap_extend
+        diagonal[:, 1:] = np.maximum(column[:, :-1] + scores[:, codes[:, j - 1]].T, horizontal[:, 1:])
+        if local:
+            np.maximum(diagonal, 0.0, out=diagonal)
+
+        shifted = np.maximum.accumulate(diagonal - positions * gap_extend, axis=1)
+        column = diagonal
+        np.maximum(column[:, 1:], vertical_offsets + shifted[:, :-1], out=column[:, 1:])
+
+        active = lengths >= j
+        if local:
+            best = np.where(active, np.maximum(best, column.max(axis=1)), best)
+        else:
+            finals = np.where(lengths == j, column[:, m], finals)
+
+    return best if local else finals
+
+class AlignmentEngine:
+    def __init__(self, scoring=None, mode="global"):
+        if mode not in ("global", "local"):
+            raise ValueError(f"modo de alinhamento desconhecido: {mode!r}")
+        self.scoring = scoring if scoring is not None else Scoring()
+        self.mode = mode
+        self.local = mode == "local"
+        self.fold = None if self.local else self.scoring.unit_fold()
+
+        self.reference = lambda target, current: self._distance_from_score(
+            target, current, reference_score(target, current, self.scoring, self.local))
+        self.engines = {
+            "linear_space": lambda target, current: self._distance_from_score(
+                target, current, gotoh_score(target, current, self.scoring, self.local)),
+            "numpy_batch": lambda target, current: float(self.batch_distance(target, [current])[0])
+        }
+        if self.fold is not None:
+            self.engines["bit_parallel"] = self.distance
+
+    def __repr__(self):
+        return f"AlignmentEngine(mode={self.mode!r})"
+
+    def score(self, target, current, prepared=None):
+        if self.fold is not None:
+            # Nota global = (m + n) / 2 - Levenshtein das frases normalizadas
+            if prepared is None:
+                prepared = PreparedTarget(self.fold(target))
+            return (len(target) + len(current)) / 2 - prepared.distance(self.fold(current))
+        return gotoh_score(target, current, self.scoring, self.local)
+
+    def scale(self, target, current):
+        # Global: a frase mais longa; local: o alvo, que deve aparecer no texto
+        return len(target) if self.local else max(len(target), len(current))
+
+    def similarity_from_score(self, target, current, score):
+        length = self.scale(target, current)
+        if not length:
+            return 1.0
+        return min(1.0, max(0.0, score / (self.scoring.match * length)))
+
+    def _distance_from_score(self, target, current, score):
+        similarity = self.similarity_from_score(target, current, score)
+        return round((1 - similarity) * self.scale(target, current), 6)
+
+    def similarity_from_distance(self, target, current, distance):
+        # Inversa de _distance_from_score; é o que score_alignment usa
+        length = self.scale(target, current)
+        if not length:
+            return 1.0
+        return 1 - distance / length
+
+    def similarity(self, target, current):
+        return self.similarity_from_distance(target, current, self.distance(target, current))
+
+    def distance(self, target, current):
+        return self._distance_from_score(target, current, self.score(target, current))
+
+    def batch_similarity(self, target, candidates):
+        import numpy as np
+
+        candidates = list(candidates)
+        scores = batch_score(target, candidates, self.scoring, self.local)
+        lengths = np.fromiter(map(len, candidates), dtype=np.int64, count=len(candidates))
+        scale = np.full(len(candidates), len(target)) if self.local else np.maximum(lengths, len(target))
+        similarities = np.ones(len(candidates))
+        nonempty = scale > 0
+        similarities[nonempty] = np.clip(scores[nonempty] / (self.scoring.match * scale[nonempty]), 0.0, 1.0)
+        return similarities
+
+    def batch_distance(self, target, candidates):
+        import numpy as np
+
+        candidates = list(candidates)
+        lengths = np.fromiter(map(len, candidates), dtype=np.int64, count=len(candidates))
+        scale = np.full(len(candidates), len(target)) if self.local else np.maximum(lengths, len(target))
+        return np.round((1 - self.batch_similarity(target, candidates)) * scale, 6)
+
+    def prepare(self, text):
+        if self.fold is None:
+            return ScalarTarget(text, self, self.distance, self.similarity_from_distance)
+        # O alvo normalizado é preparado uma vez só
+        prepared = PreparedTarget(self.fold(text))
+        return ScalarTarget(text, self, lambda target, current: self._distance_from_score(
+            target, current, self.score(target, current, prepared)), self.similarity_from_distance)
+
+# Motores prontos: notas parciais para acento e caixa, a mesma coisa em
+# modo local para textos longos e a versão que ignora acentos por
+# completo, que roda no núcleo bit-paralelo.
+ENGINES = {
+    "acentos": AlignmentEngine(Scoring(accent=0.75, case=0.75)),
+    "acentos_local": AlignmentEngine(
+        Scoring(mismatch=-1.0, accent=0.75, case=0.75, gap_open=-1.0, gap_extend=-0.5), "local"),
+    "sem_acentos": AlignmentEngine(Scoring(accent=1.0))
+}
@@ -0,0 +1,47 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Execução em blocos das ferramentas em lote (bulk_score, puzzles,
+# simulate) e percentis dos relatórios de tempo (simulate, profiler). Os
+# blocos vão para um pool de processos, mas só alguns ficam pendentes por
+# vez: a memória não cresce com o tamanho da entrada e os resultados saem
+# na ordem dos blocos, então a saída é a mesma com qualquer número de
+# processos.
+
+def chunked(items, chunk_size):
+    # Agrupa items em listas de até chunk_size elementos
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def map_chunks(function, chunks, workers=None, *args):
+    # Gera (bloco, function(bloco, *args)) na ordem dos blocos. Com
+    # workers <= 1 roda neste processo; workers=None usa um processo por
+    # núcleo. function precisa ser de nível de módulo (vai por pickle).
+    if workers is not None and workers <= 1:
+        for chunk in chunks:
+            yield chunk, function(chunk, *args)
+        return
+
+    max_pending = 2 * (workers or os.cpu_count() or 1)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(function, chunk, *args)))
+            if len(pending) >= max_pending:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+def percentile(values, point):
+    # Posto mais próximo; values já ordenado
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, -(-point * len(values) // 100) - 1))]
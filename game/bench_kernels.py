@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark dos núcleos de sequence_alignment
+
+Antes de medir, cada motor de cada métrica de METRICS e de cada motor de
+alinhamento com pesos (alignment_engine.ENGINES) é comparado com a
+referência da métrica em casos fixos e aleatórios (teste diferencial). O
+script de edição de align é conferido com a distância de referência, o
+solver de trocas é conferido com uma força bruta em frases curtas e as
+atualizações de BlockStatuses com o recálculo do zero. Nos motores de
+alinhamento, a similaridade de score_alignment também é conferida com a
+do próprio motor. Depois são medidos levenshtein_distance, cada motor,
+calculate_similarity, get_feedback e shuffle_string para tamanhos de 10
+a 10.000 caracteres, alfabetos ASCII e latino acentuado e vários níveis
+de similaridade.
+
+Os tempos são comparados com uma linha de base salva em disco; se algum
+núcleo ficar mais lento que a base além do limite, o script sai com
+código 1.
+
+Uso:
+    python bench_kernels.py --save-baseline
+    python bench_kernels.py [--threshold 0.25] [--quick]
+    python bench_kernels.py --check-only
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import string
+import sys
+import time
+
+from alignment_engine import ENGINES
+from block_status import BlockStatuses
+from constants import DATA_DIR
+from sequence_alignment import (
+    METRICS,
+    align,
+    calculate_similarity,
+    get_feedback,
+    levenshtein_distance,
+    score_alignment,
+    shuffle_string
+)
+from solver import best_swap, min_swaps
+
+BASELINE_FILE = os.path.join(DATA_DIR, "bench_baseline.json")
+
+ALPHABETS = {
+    "ascii": string.ascii_letters + string.digits + " .,!?",
+    "acentuado": "abcdefghijklmnopqrstuvwxyzáàâãéêíóôõúüçÁÀÂÃÉÊÍÓÔÕÚÇ ."
+}
+LENGTHS = (10, 100, 1000, 10000)
+QUICK_LENGTHS = (10, 100, 1000)
+SIMILARITIES = (0.9, 0.5, 0.0)
+
+# Núcleos quadráticos em Python puro ficam de fora dos tamanhos maiores
+QUADRATIC_LIMIT = 1000
+QUADRATIC_KERNELS = {"levenshtein_distance", "engine:two_rows", "engine:banded",
+                     "engine:osa:three_rows", "engine:damerau:incremental"}
+
+# A referência de Gotoh guarda três matrizes completas em Python puro
+ALIGNMENT_CHECK_LIMIT = 70
+
+CORRECTNESS_CASES = [
+    ("", "", 0),
+    ("a", "", 1),
+    ("", "a", 1),
+    ("abc", "abc", 0),
+    ("abc", "abd", 1),
+    ("abc", "abcd", 1),
+    ("abcd", "abc", 1),
+    ("kitten", "sitting", 3),
+    ("ação", "acao", 2),
+    ("Merci beaucoup.", "Merci beacuoup.", 2)
+]
+
+# Alvo curto dentro de um texto longo: no modo local a similaridade é
+# relativa ao alvo, não à frase mais longa
+SIMILARITY_CASES = [
+    ("coração", "zzzzzzzzzz corazzo zzzzzzzzzz")
+]
+
+# Frases em que a troca gulosa do solver não é ótima (11 contra 10)
+SOLVER_CASES = [
+    ("fccedbafbdbaeda", "eaeabfddcbadbcf")
+]
+
+def make_pair(alphabet, length, similarity, rng):
+    """Frase alvo e uma variação com cerca de similarity de posições iguais"""
+    target = "".join(rng.choice(alphabet) for _ in range(length))
+    current = [char if rng.random() < similarity else rng.choice(alphabet) for char in target]
+    return target, "".join(current)
+
+def checked_metrics():
+    # Métricas de METRICS e motores de alinhamento com pesos
+    yield from METRICS.items()
+    for name, engine in ENGINES.items():
+        yield f"alinhamento:{name}", engine
+
+def engine_name(metric, name):
+    # Os motores de Levenshtein mantêm os nomes das linhas de base antigas
+    return f"engine:{name}" if metric == "levenshtein" else f"engine:{metric}:{name}"
+
+def script_errors(target, current, script, expected):
+    """Problemas do script de edição de align; lista vazia se está certo"""
+    errors = []
+    cost = sum(operation.kind != "match" for operation in script)
+    if cost != expected:
+        errors.append(f"custo {cost}")
+    target_indices = [op.target_index for op in script if op.target_index is not None]
+    current_indices = [op.current_index for op in script if op.current_index is not None]
+    if target_indices != list(range(len(target))) or current_indices != list(range(len(current))):
+        errors.append("índices fora de ordem")
+    if any(op.kind == "match" and target[op.target_index] != current[op.current_index] for op in script):
+        errors.append("match com letras diferentes")
+    return errors
+
+def differential_check(random_cases=300, seed=0):
+    """Compara cada motor com a referência; retorna a lista de divergências"""
+    rng = random.Random(seed)
+    cases = [(str1, str2) for str1, str2, _ in CORRECTNESS_CASES] + SIMILARITY_CASES
+    reference = METRICS["levenshtein"].reference
+    failures = [
+        ("reference", str1, str2, reference(str1, str2), expected)
+        for str1, str2, expected in CORRECTNESS_CASES
+        if reference(str1, str2) != expected
+    ]
+
+    for i in range(random_cases):
+        alphabet = ALPHABETS["ascii" if i % 2 else "acentuado"][:rng.randint(2, 12)]
+        length = rng.choice((rng.randint(0, 12), rng.randint(0, 70), 200))
+        target, current = make_pair(alphabet, length, rng.random(), rng)
+        cases.append((target, current[:rng.randint(0, len(current))] if i % 3 == 0 else current))
+
+    for target, current in cases:
+        errors = script_errors(target, current, align(target, current), reference(target, current))
+        if errors:
+            failures.append(("align", target, current, ", ".join(errors), "script válido"))
+        for metric, definition in checked_metrics():
+            if metric.startswith("alinhamento:") and len(target) > ALIGNMENT_CHECK_LIMIT:
+                continue
+            expected = definition.reference(target, current)
+            for name, engine in definition.engines.items():
+                distance = engine(target, current)
+                if distance != expected:
+                    failures.append((engine_name(metric, name), target, current, distance, expected))
+            if metric.startswith("alinhamento:"):
+                # O resultado de score_alignment usa a escala do motor
+                similarity = score_alignment(target, current, definition).similarity
+                expected = definition.similarity(target, current)
+                if similarity != expected:
+                    failures.append((f"{metric}:similarity", target, current, similarity, expected))
+    return failures
+
+def reference_min_swaps(target, current):
+    """Mínimo de trocas por força bruta: n - máximo de ciclos entre todas
+    as correspondências de posições com a mesma letra (só frases curtas).
+    Posições já certas são ciclos de uma posição e ficam de fora."""
+    mismatched = [i for i, (char, wanted) in enumerate(zip(current, target)) if char != wanted]
+    current = "".join(current[i] for i in mismatched)
+    target = "".join(target[i] for i in mismatched)
+    sources = {}
+    for i, char in enumerate(current):
+        sources.setdefault(char, []).append(i)
+    destinations = {}
+    for j, char in enumerate(target):
+        destinations.setdefault(char, []).append(j)
+
+    letters = list(destinations)
+    best = None
+    for choice in itertools.product(*(itertools.permutations(destinations[char]) for char in letters)):
+        mapping = {}
+        for char, positions in zip(letters, choice):
+            mapping.update(zip(sources[char], positions))
+        visited = set()
+        cycles = 0
+        for start in range(len(current)):
+            if start in visited:
+                continue
+            cycles += 1
+            position = start
+            while position not in visited:
+                visited.add(position)
+                position = mapping[position]
+        if best is None or len(current) - cycles < best:
+            best = len(current) - cycles
+    return best
+
+def solver_check(random_cases=300, seed=0):
+    """Confere min_swaps e best_swap com a força bruta"""
+    rng = random.Random(seed)
+    cases = list(SOLVER_CASES)
+    for _ in range(random_cases):
+        target = "".join(rng.choice("abcde"[:rng.randint(2, 5)]) for _ in range(rng.randint(2, 10)))
+        chars = list(target)
+        rng.shuffle(chars)
+        cases.append((target, "".join(chars)))
+
+    failures = []
+    for target, current in cases:
+        expected = reference_min_swaps(target, current)
+
+        swaps = min_swaps(current, target, work_budget=None)
+        if swaps != expected:
+            failures.append(("min_swaps", target, current, swaps, expected))
+
+        # Prazo folgado: aqui importa a troca ótima, não o tempo
+        hint = best_swap(current, target, time_budget=1.0)
+        if hint is not None:
+            i, j = hint
+            chars = list(current)
+            chars[i], chars[j] = chars[j], chars[i]
+            remaining = reference_min_swaps(target, "".join(chars))
+            if remaining != expected - 1:
+                failures.append(("best_swap", target, current, remaining + 1, expected))
+        elif expected:
+            failures.append(("best_swap", target, current, None, expected))
+    return failures
+
+def block_status_check(random_cases=200, steps=30, seed=0):
+    """Confere as atualizações de BlockStatuses com o recálculo do zero"""
+    rng = random.Random(seed)
+    failures = []
+    for _ in range(random_cases):
+        alphabet = "aab c"[:rng.randint(1, 5)]
+        target = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        current = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        blocks = BlockStatuses(target, current)
+        for _ in range(steps):
+            action = rng.random()
+            if action < 0.5 and len(current) >= 2:
+                i, j = rng.sample(range(len(current)), 2)
+                chars = list(current)
+                chars[i], chars[j] = chars[j], chars[i]
+                current = "".join(chars)
+                blocks.swap(i, j)
+                name = "BlockStatuses.swap"
+            elif action < 0.75 or not current:
+                char = rng.choice(alphabet)
+                current += char
+                blocks.push(char)
+                name = "BlockStatuses.push"
+            else:
+                current = current[:-1]
+                blocks.pop()
+                name = "BlockStatuses.pop"
+
+            expected = BlockStatuses(target, current)
+            if (blocks.states() != expected.states()
+                    or +blocks.counts != +expected.counts or blocks.current != expected.current):
+                failures.append((name, target, current, blocks.states(), expected.states()))
+                break
+    return failures
+
+def measure(function, min_time=0.02, repeat=5):
+    """Melhor tempo por chamada entre repeat medições de pelo menos min_time"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def kernels_for(target, current, similarity, rng):
+    kernels = {
+        "levenshtein_distance": lambda: levenshtein_distance(target, current),
+        "calculate_similarity": lambda: calculate_similarity(target, current),
+        "get_feedback": lambda: get_feedback(target, current),
+        "shuffle_string": lambda: shuffle_string(target, 1 - similarity, rng)
+    }
+    for metric, definition in METRICS.items():
+        for name, engine in definition.engines.items():
+            kernels[engine_name(metric, name)] = lambda engine=engine: engine(target, current)
+    return kernels
+
+def run_benchmarks(lengths=LENGTHS, min_time=0.02, selected=None):
+    """Retorna {"núcleo|alfabeto|tamanho|similaridade": segundos por chamada}"""
+    results = {}
+    for alphabet_name, alphabet in ALPHABETS.items():
+        for length in lengths:
+            for similarity in SIMILARITIES:
+                rng = random.Random(f"{alphabet_name}:{length}:{similarity}")
+                target, current = make_pair(alphabet, length, similarity, rng)
+                for kernel, function in kernels_for(target, current, similarity, rng).items():
+                    if selected and not any(name in kernel for name in selected):
+                        continue
+                    if kernel in QUADRATIC_KERNELS and length > QUADRATIC_LIMIT:
+                        continue
+                    key = f"{kernel}|{alphabet_name}|{length}|{similarity}"
+                    results[key] = measure(function, min_time)
+                    print(f"  {key:55s} {results[key] * 1e6:12.1f} µs", file=sys.stderr)
+    return results
+
+def compare(results, baseline, threshold):
+    """Casos mais lentos que a base por mais de threshold (0.25 = 25%)"""
+    regressions = []
+    for key, seconds in sorted(results.items()):
+        base = baseline.get(key)
+        if base and seconds > base * (1 + threshold):
+            regressions.append((key, base, seconds))
+    return regressions
+
+def load_baseline(path):
+    try:
+        with open(path, "r", encoding="utf-8") as baseline_file:
+            return json.load(baseline_file)["results"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as baseline_file:
+        json.dump({"python": sys.version.split()[0], "results": results}, baseline_file, indent=2)
+    os.replace(temporary_path, path)
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Micro-benchmark dos núcleos de sequence_alignment")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="arquivo JSON da linha de base")
+    parser.add_argument("--save-baseline", action="store_true", help="grava os tempos como nova linha de base")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="lentidão tolerada em relação à base (0.25 = 25%%)")
+    parser.add_argument("--quick", action="store_true", help="pula as frases de 10.000 caracteres")
+    parser.add_argument("--kernel", action="append", help="mede só os núcleos cujo nome contém este texto")
+    parser.add_argument("--check-only", action="store_true", help="roda só o teste diferencial")
+    args = parser.parse_args()
+
+    failures = differential_check() + solver_check() + block_status_check()
+    for name, target, current, distance, expected in failures[:10]:
+        print(f"✗ {name}: {target!r} -> {current!r} = {distance} (esperado: {expected})", file=sys.stderr)
+    if failures:
+        print(f"✗ {len(failures)} divergência(s) em relação às referências", file=sys.stderr)
+        sys.exit(1)
+    definitions = [definition for _, definition in checked_metrics()]
+    engines = sum(len(definition.engines) for definition in definitions)
+    print(f"✓ {engines} motores conferem com as referências de {len(definitions)} métricas", file=sys.stderr)
+    print("✓ Scripts de edição de align conferem com a distância de Levenshtein", file=sys.stderr)
+    print("✓ min_swaps e best_swap conferem com a força bruta", file=sys.stderr)
+    print("✓ BlockStatuses incremental confere com o recálculo do zero", file=sys.stderr)
+    if args.check_only:
+        return
+
+    results = run_benchmarks(QUICK_LENGTHS if args.quick else LENGTHS, selected=args.kernel)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"✓ Linha de base salva em {args.baseline}", file=sys.stderr)
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"Sem linha de base em {args.baseline}; use --save-baseline", file=sys.stderr)
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    for key, base, seconds in regressions:
+        print(f"✗ {key}: {base * 1e6:.1f} µs -> {seconds * 1e6:.1f} µs (+{seconds / base - 1:.0%})",
+              file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+    print(f"✓ Nenhuma regressão acima de {args.threshold:.0%}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+from bisect import bisect_left, insort
+from collections import Counter
+
+# Estado de cada bloco da frase atual, como no Wordle: "correct" quando a
+# letra está na posição certa, "misplaced" quando o alvo ainda precisa
+# dessa letra em outra posição e "wrong" quando não precisa. Letras
+# repetidas são contadas: se o alvo ainda espera dois "a" fora do lugar,
+# só os dois primeiros "a" errados da frase ficam "misplaced".
+#
+# Uma troca ou uma letra digitada só mexe nas contas das letras
+# envolvidas, então a atualização percorre só as posições dessas letras.
+
+CORRECT = "correct"
+MISPLACED = "misplaced"
+WRONG = "wrong"
+
+class BlockStatuses:
+    def __init__(self, target, current=""):
+        self.target = target
+        self.reset(current)
+
+    def reset(self, current):
+        self.current = list(current)
+        self.statuses = [None] * len(current)
+        self.counts = Counter()
+        # missing[c]: posições do alvo com c que ainda não estão certas
+        # (_place desconta as que já estão)
+        self.missing = Counter(self.target)
+        # unmatched[c]: posições da frase com c fora do lugar, em ordem
+        self.unmatched = {}
+        for k, char in enumerate(current):
+            self._place(k, char)
+        self._refresh(self.unmatched)
+
+    def states(self):
+        # Tupla para o desenho, refeita só depois de uma mudança
+        if self._snapshot is None:
+            self._snapshot = tuple(self.statuses)
+        return self._snapshot
+
+    def swap(self, index1, index2):
+        char1, char2 = self.current[index1], self.current[index2]
+        if char1 == char2:
+            return
+        self._remove(index1)
+        self._remove(index2)
+        self._place(index1, char2)
+        self._place(index2, char1)
+        self._refresh({char1, char2} | self._wanted_at(index1, index2))
+
+    def push(self, char):
+        self.current.append(char)
+        self.statuses.append(None)
+        self._place(len(self.current) - 1, char)
+        self._refresh({char})
+
+    def pop(self):
+        index = len(self.current) - 1
+        char = self.current[index]
+        self._remove(index)
+        self._set_status(index, None)
+        self.current.pop()
+        self.statuses.pop()
+        self._refresh({char} | self._wanted_at(index))
+
+    def _wanted_at(self, *indices):
+        return {self.target[k] for k in indices if k < len(self.target)}
+
+    def _place(self, index, char):
+        self.current[index] = char
+        if index < len(self.target) and self.target[index] == char:
+            self.missing[char] -= 1
+            self._set_status(index, CORRECT)
+        else:
+            insort(self.unmatched.setdefault(char, []), index)
+
+    def _remove(self, index):
+        char = self.current[index]
+        if self.statuses[index] == CORRECT:
+            self.missing[char] += 1
+        else:
+            positions = self.unmatched[char]
+            del positions[bisect_left(positions, index)]
+
+    def _refresh(self, chars):
+        for char in chars:
+            missing = self.missing[char]
+            for rank, index in enumerate(self.unmatched.get(char, ())):
+                self._set_status(index, MISPLACED if rank < missing else WRONG)
+        self._snapshot = None
+
+    def _set_status(self, index, status):
+        previous = self.statuses[index]
+        if previous == status:
+            return
+        if previous is not None:
+            self.counts[previous] -= 1
+        if status is not None:
+            self.counts[status] += 1
+        self.statuses[index] = status
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Pontuação em massa de tentativas exportadas do Sequence Alignment Game
+
+Lê um arquivo JSONL ou CSV com as colunas language, target e attempt,
+pontua as linhas em blocos num pool de processos e escreve cada linha de
+volta, na mesma ordem, com distance, similarity, bucket e feedback.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from batch import chunked, map_chunks
+from sequence_alignment import METRICS, prepare_target, score_alignment
+
+def detect_format(path, requested, default="jsonl"):
+    """Escolhe o formato pelo argumento ou pela extensão do arquivo"""
+    if requested:
+        return requested
+    if path.lower().endswith(".csv"):
+        return "csv"
+    if path.lower().endswith((".jsonl", ".json")):
+        return "jsonl"
+    return default
+
+def read_rows(handle, file_format):
+    """Lê as linhas do arquivo sem carregá-lo inteiro na memória"""
+    if file_format == "csv":
+        yield from csv.DictReader(handle)
+        return
+
+    for line in handle:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def score_pairs(pairs, metric="levenshtein"):
+    """Pontua uma lista de pares (alvo, tentativa) num processo do pool"""
+    prepared_targets = {}
+    results = []
+
+    for target, attempt in pairs:
+        prepared = prepared_targets.get(target)
+        if prepared is None:
+            prepared = prepared_targets[target] = prepare_target(target, metric)
+        result = score_alignment(prepared, attempt)
+        results.append((result.distance, result.similarity, result.bucket, result.message_key))
+
+    return results
+
+def score_rows(rows, metric="levenshtein"):
+    """Pontua um bloco de linhas lidas do arquivo"""
+    return score_pairs([(row["target"], row["attempt"]) for row in rows], metric)
+
+class RowWriter:
+    """Escreve as linhas pontuadas em JSONL ou CSV"""
+
+    def __init__(self, handle, file_format):
+        self.handle = handle
+        self.file_format = file_format
+        self.csv_writer = None
+
+    def write(self, row):
+        if self.file_format == "jsonl":
+            self.handle.write(json.dumps(row, ensure_ascii=False) + "\n")
+            return
+
+        if self.csv_writer is None:
+            self.csv_writer = csv.DictWriter(self.handle, fieldnames=list(row.keys()))
+            self.csv_writer.writeheader()
+        self.csv_writer.writerow(row)
+
+def write_chunk(writer, rows, results):
+    """Junta as linhas originais com seus resultados e as escreve"""
+    for row, (distance, similarity, bucket, feedback) in zip(rows, results):
+        row["distance"] = distance
+        row["similarity"] = similarity
+        row["bucket"] = bucket
+        row["feedback"] = feedback
+        writer.write(row)
+
+def score_file(input_handle, output_handle, input_format, output_format, workers, chunk_size,
+               metric="levenshtein"):
+    """Pontua o arquivo inteiro e retorna o número de linhas processadas"""
+    writer = RowWriter(output_handle, output_format)
+    chunks = chunked(read_rows(input_handle, input_format), chunk_size)
+    total = 0
+
+    for rows, results in map_chunks(score_rows, chunks, workers, metric):
+        write_chunk(writer, rows, results)
+        total += len(rows)
+
+    return total
+
+def open_input(path):
+    if path == "-":
+        return sys.stdin
+    return open(path, "r", encoding="utf-8", newline="")
+
+def open_output(path):
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", newline="")
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Pontua tentativas de jogadores em massa")
+    parser.add_argument("input", help="arquivo JSONL ou CSV de entrada ('-' para stdin)")
+    parser.add_argument("output", nargs="?", default="-", help="arquivo de saída ('-' para stdout)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"])
+    parser.add_argument("--output-format", choices=["jsonl", "csv"])
+    parser.add_argument("--metric", choices=list(METRICS), default="levenshtein",
+                        help="métrica de distância (osa e damerau contam trocas de letras vizinhas)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    input_format = detect_format(args.input, args.input_format)
+    output_format = detect_format(args.output, args.output_format, input_format)
+
+    start_time = time.perf_counter()
+    input_handle = open_input(args.input)
+    output_handle = open_output(args.output)
+    try:
+        total = score_file(input_handle, output_handle, input_format, output_format,
+                           args.workers, args.chunk_size, args.metric)
+    finally:
+        if input_handle is not sys.stdin:
+            input_handle.close()
+        if output_handle is not sys.stdout:
+            output_handle.close()
+    elapsed_time = time.perf_counter() - start_time
+
+    rate = total / elapsed_time if elapsed_time > 0 else 0.0
+    print(f"✓ {total} linhas pontuadas em {elapsed_time:.2f}s ({rate:.0f} linhas/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
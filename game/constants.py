@@ -1,4 +1,4 @@
-import pygame
+import os
 
 WIDTH, HEIGHT = 1000, 700
 WHITE = (255, 255, 255)
@@ -13,6 +13,14 @@ DARK_GRAY = (64, 64, 64)
 ORANGE = (255, 165, 0)
 LIGHT_BLUE = (173, 216, 230)
 
+FONT_NAME = "arial"
+FONT_SIZES = {
+    "large": 32,
+    "medium": 24,
+    "small": 18,
+    "tiny": 13
+}
+
 PHRASES = {
     "Português": [
         "Bom dia!",
@@ -37,14 +45,28 @@ PHRASES = {
     ]
 }
 
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".sequence_alignment_game")
+RECORDS_FILE = os.path.join(DATA_DIR, "records.jsonl")
+FONT_MANIFEST = os.path.join(DATA_DIR, "fonts.json")
+RECORDS_PER_GROUP = 5
+
 MAX_ATTEMPTS = 50
 TIME_LIMIT = 300
+HINT_TIME_BUDGET = 0.005
 DIFFICULTY_LEVELS = {
     "Fácil": 0.3,
     "Médio": 0.5,
     "Difícil": 0.7
 }
 
+# Métrica de sequence_alignment.METRICS usada em cada nível: no Fácil e no
+# Médio duas letras vizinhas trocadas contam como um erro só
+DIFFICULTY_METRICS = {
+    "Fácil": "osa",
+    "Médio": "osa",
+    "Difícil": "levenshtein"
+}
+
 PERFECT_COLOR = GREEN
 GOOD_COLOR = BLUE
 OK_COLOR = YELLOW
@@ -52,5 +74,13 @@ BAD_COLOR = RED
 
 BLOCK_NORMAL = LIGHT_BLUE
 BLOCK_SELECTED = ORANGE
+BLOCK_HOVER = (135, 206, 250)
+BLOCK_HINT = (144, 238, 144)
 BLOCK_SPACE = LIGHT_GRAY
+BLOCK_CORRECT = (46, 139, 87)
+BLOCK_MISPLACED = (238, 201, 0)
+BLOCK_WRONG = (250, 160, 122)
+
+# Letras além do tamanho do alvo que o modo de digitação aceita
+TYPING_SLACK = 20
 
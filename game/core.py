@@ -1,123 +1,235 @@
+import os
 import pygame
-import random
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from constants import *
-from sequence_alignment import calculate_similarity, get_feedback, shuffle_string
-
-pygame.init()
-
-FONT_LARGE = pygame.font.SysFont("arial", 32)
-FONT_MEDIUM = pygame.font.SysFont("arial", 24)
-FONT_SMALL = pygame.font.SysFont("arial", 18)
-
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Sequence Alignment Game")
-
-class GameState:
-    def __init__(self):
-        self.target_phrase = ""
-        self.current_phrase = ""
-        self.shuffled_phrase = ""
-        self.difficulty = "Médio"
-        self.language = "Português"
-        self.attempts = 0
-        self.start_time = time.time()
-        self.similarity = 0.0
-        self.distance = 0
-        self.feedback = ""
-        self.game_won = False
-        self.game_over = False
-        self.selected_char_index = -1
-        self.record_times = []
-        self.show_language_menu = True
-        self.victory_time = None
+from fonts import FontResolver
+from game_logic import GameState
+from layout import PhraseLayout
+from profiler import FrameProfiler
+from records import RecordStore
+from startup import timed
+
+# Janela e fontes são criadas só no primeiro desenho (init_display e
+# get_font); importar este módulo não inicializa o pygame.
+WIN = None
+FONTS = {}
+FONT_RESOLVER = None
+
+def init_display(headless=False):
+    global WIN
+    if WIN is not None:
+        # Janela reaproveitada de uma sessão anterior (run_game.py)
+        WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+        return WIN
+    
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    with timed("pygame.display.init"):
+        pygame.display.init()
+        pygame.font.init()
+    with timed("set_mode"):
+        WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Sequence Alignment Game")
+    return WIN
+
+def get_font(size):
+    global FONT_RESOLVER
+    font = FONTS.get(size)
+    if font is None:
+        with timed(f"fonte {FONT_NAME} {FONT_SIZES[size]}"):
+            if FONT_RESOLVER is None:
+                FONT_RESOLVER = FontResolver()
+            font = FONTS[size] = FONT_RESOLVER.load(FONT_NAME, FONT_SIZES[size])
+    return font
+
+def shutdown_display():
+    global WIN
+    WIN = None
+    FONTS.clear()
+    BLOCK_ATLAS.tiles.clear()
+    for scene in (MENU_SCENE, GAME_SCENE, VICTORY_SCENE, GAME_OVER_SCENE):
+        scene.invalidate()
+    pygame.quit()
+
+game_state = GameState(RecordStore(RECORDS_FILE, RECORDS_PER_GROUP))
+
+class BlockAtlas:
+    # Cache LRU de blocos de letra já renderizados (fundo, borda e
+    # caractere) por (caractere, estado, tamanho). Cada quadro só copia
+    # os blocos.
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self.tiles = OrderedDict()
+    
+    def tile(self, char, state, size=(25, 35)):
+        key = (char, state, size)
+        surface = self.tiles.get(key)
+        if surface is not None:
+            self.tiles.move_to_end(key)
+            return surface
         
-    def new_game(self):
-        self.target_phrase = random.choice(PHRASES[self.language])
-        difficulty_value = DIFFICULTY_LEVELS[self.difficulty]
-        self.shuffled_phrase = shuffle_string(self.target_phrase, difficulty_value)
-        self.current_phrase = self.shuffled_phrase
-        self.attempts = 0
-        self.start_time = time.time()
-        self.game_won = False
-        self.game_over = False
-        self.selected_char_index = -1
-        self.victory_time = None
-        self.update_feedback()
+        surface = self.render_tile(char, state, size)
+        self.tiles[key] = surface
+        if len(self.tiles) > self.capacity:
+            self.tiles.popitem(last=False)
+        return surface
+    
+    def render_tile(self, char, state, size):
+        if state == "selected":
+            block_color = BLOCK_SELECTED
+            text_color = BLACK
+        elif state == "hover":
+            block_color = BLOCK_HOVER
+            text_color = BLACK
+        elif state == "hint":
+            block_color = BLOCK_HINT
+            text_color = BLACK
+        elif state == "space":
+            block_color = BLOCK_SPACE
+            text_color = GRAY
+        elif state == "correct":
+            block_color = BLOCK_CORRECT
+            text_color = WHITE
+        elif state == "misplaced":
+            block_color = BLOCK_MISPLACED
+            text_color = BLACK
+        elif state == "wrong":
+            block_color = BLOCK_WRONG
+            text_color = BLACK
+        else:
+            block_color = BLOCK_NORMAL
+            text_color = BLACK
         
-    def update_feedback(self):
-        self.feedback, self.similarity, self.distance = get_feedback(self.target_phrase, self.current_phrase)
-        if self.similarity == 1.0 and not self.game_won:
-            self.game_won = True
-            self.victory_time = time.time() - self.start_time
+        block_width, block_height = size
+        surface = pygame.Surface(size).convert()
+        surface.fill(block_color)
+        pygame.draw.rect(surface, WHITE, (0, 0, block_width, block_height), 2 if block_height >= 30 else 1)
         
-    def swap_chars(self, index1, index2):
-        if 0 <= index1 < len(self.current_phrase) and 0 <= index2 < len(self.current_phrase):
-            chars = list(self.current_phrase)
-            chars[index1], chars[index2] = chars[index2], chars[index1]
-            self.current_phrase = ''.join(chars)
-            self.attempts += 1
-            self.update_feedback()
+        # Blocos reduzidos (frases longas) usam fontes menores
+        if block_height >= 30:
+            char_font, space_font = "medium", "small"
+        elif block_height >= 24:
+            char_font, space_font = "small", "tiny"
+        else:
+            char_font, space_font = "tiny", "tiny"
+        if char == ' ':
+            char_surface = get_font(space_font).render('_', True, text_color)
+        else:
+            char_surface = get_font(char_font).render(char, True, text_color)
         
-    def check_time_limit(self):
-        if self.game_won and self.victory_time is not None:
-            return self.victory_time
-        elapsed_time = time.time() - self.start_time
-        if elapsed_time > TIME_LIMIT:
-            self.game_over = True
-        return elapsed_time
+        text_rect = char_surface.get_rect(center=(block_width // 2, block_height // 2))
+        surface.blit(char_surface, text_rect)
+        return surface
 
-game_state = GameState()
+BLOCK_ATLAS = BlockAtlas(capacity=256)
 
-def draw_phrase_box(phrase, x, y, width, height, title, color=WHITE, selected_index=-1):
-    pygame.draw.rect(WIN, DARK_GRAY, (x, y, width, height))
-    pygame.draw.rect(WIN, color, (x, y, width, height), 2)
+def draw_phrase_box(surface, phrase, layout, title, color=WHITE, selected_index=-1, hover_index=-1, hint=None,
+                    states=None, first_line=0):
+    # Desenha a caixa com a origem da superfície no canto da caixa
+    width, height = layout.width, layout.height
+    pygame.draw.rect(surface, DARK_GRAY, (0, 0, width, height))
+    pygame.draw.rect(surface, color, (0, 0, width, height), 2)
     
-    title_surface = FONT_SMALL.render(title, True, WHITE)
-    WIN.blit(title_surface, (x + 10, y + 10))
+    title_surface = get_font("small").render(title, True, WHITE)
+    surface.blit(title_surface, (10, 10))
     
     if phrase:
-        block_width = 25
-        block_height = 35
-        block_margin = 3
-        
-        total_width = len(phrase) * (block_width + block_margin) - block_margin
-        start_x = x + (width - total_width) // 2
-        start_y = y + (height - block_height) // 2 + 20
-        
-        for i, char in enumerate(phrase):
-            char_x = start_x + i * (block_width + block_margin)
-            char_y = start_y
-            
+        blits = []
+        size = (layout.block_width, layout.block_height)
+        for i in layout.visible_range(first_line):
+            char = phrase[i]
             if i == selected_index:
-                block_color = BLOCK_SELECTED
-                text_color = BLACK
+                state = "selected"
+            elif i == hover_index:
+                state = "hover"
+            elif hint is not None and i in hint:
+                state = "hint"
+            elif states is not None:
+                state = states[i]
             elif char == ' ':
-                block_color = BLOCK_SPACE
-                text_color = GRAY
-            else:
-                block_color = BLOCK_NORMAL
-                text_color = BLACK
-            
-            pygame.draw.rect(WIN, block_color, (char_x, char_y, block_width, block_height))
-            pygame.draw.rect(WIN, WHITE, (char_x, char_y, block_width, block_height), 2)
-            
-            if char == ' ':
-                char_surface = FONT_SMALL.render('_', True, text_color)
+                state = "space"
             else:
-                char_surface = FONT_MEDIUM.render(char, True, text_color)
+                state = "normal"
             
-            text_rect = char_surface.get_rect(center=(char_x + block_width // 2, char_y + block_height // 2))
-            WIN.blit(char_surface, text_rect)
+            blits.append((BLOCK_ATLAS.tile(char, state, size), layout.block_offset(i, first_line)))
+        
+        surface.blits(blits, False)
+
+class Widget:
+    # Elemento de tela em modo retido. key_fn lê os campos do GameState
+    # dos quais o elemento depende; render_fn(key) só é chamada quando a
+    # chave muda e devolve a superfície e o retângulo onde ela fica.
+    def __init__(self, key_fn, render_fn):
+        self.key_fn = key_fn
+        self.render_fn = render_fn
+        self.key = None
+        self.surface = None
+        self.rect = None
+    
+    def refresh(self, target, redraw=False):
+        key = self.key_fn()
+        if self.surface is not None and key == self.key:
+            if redraw:
+                target.blit(self.surface, self.rect)
+            return []
+        
+        dirty = []
+        if self.rect is not None and not redraw:
+            target.fill(BLACK, self.rect)
+            dirty.append(self.rect)
+        
+        self.key = key
+        self.surface, self.rect = self.render_fn(key)
+        target.blit(self.surface, self.rect)
+        dirty.append(self.rect)
+        return dirty
+    
+    def invalidate(self):
+        self.key = None
+        self.surface = None
+        self.rect = None
+
+class Scene:
+    # Conjunto de widgets que não se sobrepõem. refresh devolve só os
+    # retângulos alterados; redraw=True repinta a tela inteira a partir
+    # das superfícies em cache (troca de tela ou janela exposta).
+    def __init__(self, widgets):
+        self.widgets = widgets
+    
+    def refresh(self, target, redraw=False):
+        if redraw:
+            target.fill(BLACK)
+            for widget in self.widgets:
+                widget.refresh(target, True)
+            return [target.get_rect()]
+        
+        dirty = []
+        for widget in self.widgets:
+            dirty.extend(widget.refresh(target))
+        return dirty
+    
+    def invalidate(self):
+        for widget in self.widgets:
+            widget.invalidate()
+
+def render_text(font_size, text, color, **position):
+    surface = get_font(font_size).render(text, True, color)
+    return surface, surface.get_rect(**position)
 
-def draw_language_menu():
-    WIN.fill(BLACK)
+def static_text(font_size, text, color, **position):
+    return Widget(lambda: None, lambda key: render_text(font_size, text, color, **position))
+
+def render_language_menu(key):
+    selected_language, languages = key
+    surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+    surface.fill(BLACK)
     
-    title = FONT_LARGE.render("Escolha o Idioma / Choose Language / Choisir la Langue", True, WHITE)
+    title = get_font("large").render("Escolha o Idioma / Choose Language / Choisir la Langue", True, WHITE)
     title_rect = title.get_rect(center=(WIDTH // 2, 100))
-    WIN.blit(title, title_rect)
+    surface.blit(title, title_rect)
     
-    languages = list(PHRASES.keys())
     button_height = 60
     button_width = 300
     start_y = 200
@@ -126,14 +238,14 @@ def draw_language_menu():
         y = start_y + i * (button_height + 20)
         x = (WIDTH - button_width) // 2
         
-        color = GREEN if language == game_state.language else BLUE
+        color = GREEN if language == selected_language else BLUE
         
-        pygame.draw.rect(WIN, color, (x, y, button_width, button_height))
-        pygame.draw.rect(WIN, WHITE, (x, y, button_width, button_height), 2)
+        pygame.draw.rect(surface, color, (x, y, button_width, button_height))
+        pygame.draw.rect(surface, WHITE, (x, y, button_width, button_height), 2)
         
-        text = FONT_MEDIUM.render(language, True, WHITE)
+        text = get_font("medium").render(language, True, WHITE)
         text_rect = text.get_rect(center=(x + button_width // 2, y + button_height // 2))
-        WIN.blit(text, text_rect)
+        surface.blit(text, text_rect)
     
     instructions = [
         "Clique em um idioma para selecionar",
@@ -142,14 +254,14 @@ def draw_language_menu():
     ]
     
     for i, instruction in enumerate(instructions):
-        text = FONT_SMALL.render(instruction, True, LIGHT_GRAY)
+        text = get_font("small").render(instruction, True, LIGHT_GRAY)
         text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT - 100 + i * 25))
-        WIN.blit(text, text_rect)
+        surface.blit(text, text_rect)
     
-    pygame.display.update()
+    return surface, surface.get_rect()
 
 def handle_language_menu_click(pos):
-    languages = list(PHRASES.keys())
+    languages = game_state.corpus.languages()
     button_height = 60
     button_width = 300
     start_y = 200
@@ -159,195 +271,388 @@ def handle_language_menu_click(pos):
         x = (WIDTH - button_width) // 2
         
         if (x <= pos[0] <= x + button_width and y <= pos[1] <= y + button_height):
-            game_state.language = language
-            game_state.show_language_menu = False
-            game_state.new_game()
+            game_state.select_language(language)
             return True
     return False
 
-def draw_controls():
-    instructions = [
+PHRASE_BOX = pygame.Rect(50, 200, WIDTH - 100, 120)
+# A caixa não passa da linha "Letras:" (HEIGHT - 130) nem dos controles
+PHRASE_BOX_MAX_HEIGHT = HEIGHT - 150 - PHRASE_BOX.y
+
+@lru_cache(maxsize=8)
+def layout_for(length):
+    return PhraseLayout(length, *PHRASE_BOX, max_height=PHRASE_BOX_MAX_HEIGHT)
+
+def phrase_layout():
+    return layout_for(len(game_state.current_phrase))
+
+def first_visible_line():
+    return phrase_layout().clamp_first_line(game_state.first_line)
+
+def scroll_phrase(lines):
+    game_state.first_line = phrase_layout().clamp_first_line(first_visible_line() + lines)
+
+def phrase_box_key():
+    return (game_state.current_phrase, game_state.selected_char_index,
+            game_state.hover_char_index, game_state.language, game_state.hint,
+            game_state.blocks.states(), game_state.input_mode, first_visible_line())
+
+PHRASE_BOX_TITLES = {
+    "swap": "Reorganize as letras para formar a frase correta ({language})",
+    "typing": "Digite a frase correta ({language})"
+}
+
+def render_phrase_box(key):
+    phrase, selected_index, hover_index, language, hint, states, input_mode, first_line = key
+    layout = layout_for(len(phrase))
+    title = PHRASE_BOX_TITLES[input_mode].format(language=language)
+    if layout.max_first_line:
+        last_line = first_line + layout.visible_lines
+        title += f" | linhas {first_line + 1}-{last_line} de {layout.lines} (roda do mouse)"
+    surface = pygame.Surface((layout.width, layout.height)).convert()
+    draw_phrase_box(
+        surface,
+        phrase,
+        layout,
+        title,
+        BLUE,
+        selected_index,
+        hover_index,
+        hint,
+        states,
+        first_line
+    )
+    return surface, pygame.Rect(layout.rect)
+
+STAT_LINES = [
+    lambda: f"Idioma: {game_state.language}",
+    lambda: f"Dificuldade: {game_state.difficulty}",
+    lambda: f"Tentativas: {game_state.attempts}/{MAX_ATTEMPTS}",
+    lambda: f"Tempo: {game_state.check_time_limit():.1f}s/{TIME_LIMIT}s",
+    lambda: f"Similaridade: {game_state.similarity:.1%}",
+    lambda: f"Distância: {game_state.distance}",
+    lambda: f"Blocos certos: {game_state.blocks.counts['correct']}/{len(game_state.target_phrase)}"
+]
+
+def stat_widgets():
+    return [
+        Widget(line, lambda text, i=i: render_text("small", text, WHITE, topleft=(20, 20 + i * 25)))
+        for i, line in enumerate(STAT_LINES)
+    ]
+
+def render_feedback(key):
+    feedback, similarity = key
+    if similarity == 1.0:
+        color = PERFECT_COLOR
+    elif similarity >= 0.7:
+        color = GOOD_COLOR
+    elif similarity >= 0.4:
+        color = OK_COLOR
+    else:
+        color = BAD_COLOR
+    
+    return render_text("medium", feedback, color, center=(WIDTH // 2, 150))
+
+CONTROL_LINES = {
+    "swap": [
         "Clique em duas letras para trocá-las",
-        "R = Novo jogo | D = Mudar dificuldade | L = Mudar idioma",
+        "R = Novo jogo | D = Mudar dificuldade | L = Mudar idioma | H = Dica | TAB = Digitar a frase",
+        "ESC = Sair"
+    ],
+    "typing": [
+        "Digite a frase usando as letras embaralhadas",
+        "Ctrl+R = Novo jogo | Ctrl+D = Mudar dificuldade | Ctrl+L = Mudar idioma | TAB = Trocar letras",
         "ESC = Sair"
     ]
-    
+}
+
+def control_widgets():
     y_offset = HEIGHT - 100
-    for i, instruction in enumerate(instructions):
-        text = FONT_SMALL.render(instruction, True, LIGHT_GRAY)
-        WIN.blit(text, (20, y_offset + i * 25))
-
-def draw_stats():
-    elapsed_time = game_state.check_time_limit()
-    
-    stats = [
-        f"Idioma: {game_state.language}",
-        f"Dificuldade: {game_state.difficulty}",
-        f"Tentativas: {game_state.attempts}/{MAX_ATTEMPTS}",
-        f"Tempo: {elapsed_time:.1f}s/{TIME_LIMIT}s",
-        f"Similaridade: {game_state.similarity:.1%}",
-        f"Distância: {game_state.distance}"
+    return [
+        Widget(lambda i=i: CONTROL_LINES[game_state.input_mode][i],
+               lambda text, i=i: render_text("small", text, LIGHT_GRAY, topleft=(20, y_offset + i * 25)))
+        for i in range(len(CONTROL_LINES["swap"]))
     ]
-    
-    for i, stat in enumerate(stats):
-        text = FONT_SMALL.render(stat, True, WHITE)
-        WIN.blit(text, (20, 20 + i * 25))
-
-def draw_feedback():
-    if game_state.feedback:
-        if game_state.similarity == 1.0:
-            color = PERFECT_COLOR
-        elif game_state.similarity >= 0.7:
-            color = GOOD_COLOR
-        elif game_state.similarity >= 0.4:
-            color = OK_COLOR
-        else:
-            color = BAD_COLOR
-            
-        feedback_surface = FONT_MEDIUM.render(game_state.feedback, True, color)
-        feedback_rect = feedback_surface.get_rect(center=(WIDTH // 2, 150))
-        WIN.blit(feedback_surface, feedback_rect)
 
-def draw_game():
-    WIN.fill(BLACK)
-    
-    title = FONT_LARGE.render("Sequence Alignment Game", True, WHITE)
-    title_rect = title.get_rect(center=(WIDTH // 2, 50))
-    WIN.blit(title, title_rect)
-    
-    draw_phrase_box(
-        game_state.current_phrase, 
-        50, 200, WIDTH - 100, 120, 
-        f"Reorganize as letras para formar a frase correta ({game_state.language})", 
-        BLUE,
-        game_state.selected_char_index
-    )
-    
-    draw_stats()
-    draw_feedback()
-    draw_controls()
-    
-    pygame.display.update()
+def render_typing_letters(key):
+    # No modo de digitação as letras embaralhadas ficam só como referência
+    input_mode, shuffled = key
+    if input_mode != "typing":
+        return pygame.Surface((0, 0)), pygame.Rect(WIDTH // 2, HEIGHT - 130, 0, 0)
+    text = f"Letras: {shuffled}"
+    font = get_font("medium")
+    if font.size(text)[0] > WIDTH - 40:
+        # Frases longas: só o começo, para não invadir as bordas
+        text = text[:WIDTH // 8]
+        while font.size(text + "…")[0] > WIDTH - 40:
+            text = text[:-1]
+        text += "…"
+    return render_text("medium", text, WHITE, center=(WIDTH // 2, HEIGHT - 130))
 
 def handle_mouse_click(pos):
-    phrase_box_x, phrase_box_y = 50, 200
-    phrase_box_width, phrase_box_height = WIDTH - 100, 120
+    index = phrase_layout().index_at(pos, first_visible_line())
+    if index is None:
+        return
+    
+    if game_state.selected_char_index == -1:
+        game_state.selected_char_index = index
+        game_state.drag_char_index = index
+    else:
+        if game_state.selected_char_index != index:
+            game_state.swap_chars(game_state.selected_char_index, index)
+        game_state.selected_char_index = -1
+        game_state.drag_char_index = -1
+
+def handle_mouse_release(pos):
+    # Arrastar um bloco e soltar sobre outro também troca as letras
+    start = game_state.drag_char_index
+    game_state.drag_char_index = -1
+    if start == -1:
+        return
+    
+    index = phrase_layout().index_at(pos, first_visible_line())
+    if index is not None and index != start and game_state.selected_char_index == start:
+        game_state.swap_chars(start, index)
+        game_state.selected_char_index = -1
+
+def handle_mouse_motion(pos):
+    index = phrase_layout().index_at(pos, first_visible_line())
+    game_state.hover_char_index = -1 if index is None else index
+
+def render_victory_screen(key):
+    target_phrase, time_taken, attempts, top_times = key
+    surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+    surface.fill(BLACK)
     
-    if (phrase_box_x <= pos[0] <= phrase_box_x + phrase_box_width and
-        phrase_box_y <= pos[1] <= phrase_box_y + phrase_box_height):
-        
-        block_width = 25
-        block_height = 35
-        block_margin = 3
-        
-        total_width = len(game_state.current_phrase) * (block_width + block_margin) - block_margin
-        start_x = phrase_box_x + (phrase_box_width - total_width) // 2
-        start_y = phrase_box_y + (phrase_box_height - block_height) // 2 + 20
-        
-        for i in range(len(game_state.current_phrase)):
-            char_x = start_x + i * (block_width + block_margin)
-            char_y = start_y
-            
-            if (char_x <= pos[0] <= char_x + block_width and 
-                char_y <= pos[1] <= char_y + block_height):
-                
-                if game_state.selected_char_index == -1:
-                    game_state.selected_char_index = i
-                else:
-                    if game_state.selected_char_index != i:
-                        game_state.swap_chars(game_state.selected_char_index, i)
-                    game_state.selected_char_index = -1
-                break
-
-def victory_screen():
-    WIN.fill(BLACK)
-    
-    victory_text = FONT_LARGE.render("Parabéns! Você venceu!", True, GREEN)
+    victory_text = get_font("large").render("Parabéns! Você venceu!", True, GREEN)
     victory_rect = victory_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 100))
-    WIN.blit(victory_text, victory_rect)
+    surface.blit(victory_text, victory_rect)
     
-    correct_text = FONT_MEDIUM.render(f"Frase correta: {game_state.target_phrase}", True, WHITE)
+    correct_text = get_font("medium").render(f"Frase correta: {target_phrase}", True, WHITE)
     correct_rect = correct_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 60))
-    WIN.blit(correct_text, correct_rect)
+    surface.blit(correct_text, correct_rect)
     
-    time_taken = game_state.victory_time if game_state.victory_time is not None else (time.time() - game_state.start_time)
-    stats_text = FONT_MEDIUM.render(f"Tempo: {time_taken:.2f}s | Tentativas: {game_state.attempts}", True, WHITE)
+    stats_text = get_font("medium").render(f"Tempo: {time_taken:.2f}s | Tentativas: {attempts}", True, WHITE)
     stats_rect = stats_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
-    WIN.blit(stats_text, stats_rect)
-    
-    game_state.record_times.append(time_taken)
-    game_state.record_times.sort()
-    top_times = game_state.record_times[:5]
+    surface.blit(stats_text, stats_rect)
     
-    records_text = FONT_MEDIUM.render("Melhores tempos:", True, WHITE)
+    records_text = get_font("medium").render("Melhores tempos:", True, WHITE)
     records_rect = records_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 20))
-    WIN.blit(records_text, records_rect)
+    surface.blit(records_text, records_rect)
     
     for i, t in enumerate(top_times):
-        record_text = FONT_SMALL.render(f"#{i+1}: {t:.2f}s", True, WHITE)
+        record_text = get_font("small").render(f"#{i+1}: {t:.2f}s", True, WHITE)
         record_rect = record_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50 + i * 25))
-        WIN.blit(record_text, record_rect)
+        surface.blit(record_text, record_rect)
     
-    continue_text = FONT_SMALL.render("Pressione R para jogar novamente ou ESC para sair", True, LIGHT_GRAY)
+    continue_text = get_font("small").render("Pressione R para jogar novamente ou ESC para sair", True, LIGHT_GRAY)
     continue_rect = continue_text.get_rect(center=(WIDTH // 2, HEIGHT - 50))
-    WIN.blit(continue_text, continue_rect)
+    surface.blit(continue_text, continue_rect)
     
-    pygame.display.update()
+    return surface, surface.get_rect()
 
-def game_over_screen():
-    WIN.fill(BLACK)
+def victory_key():
+    time_taken = game_state.victory_time if game_state.victory_time is not None else (time.time() - game_state.start_time)
+    top_times = tuple(game_state.records.top(game_state.language, game_state.difficulty))
+    return (game_state.target_phrase, time_taken, game_state.attempts, top_times)
+
+def render_game_over_screen(target_phrase):
+    surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+    surface.fill(BLACK)
     
-    game_over_text = FONT_LARGE.render("Game Over!", True, RED)
+    game_over_text = get_font("large").render("Game Over!", True, RED)
     game_over_rect = game_over_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 80))
-    WIN.blit(game_over_text, game_over_rect)
+    surface.blit(game_over_text, game_over_rect)
     
-    correct_text = FONT_MEDIUM.render(f"Frase correta: {game_state.target_phrase}", True, WHITE)
+    correct_text = get_font("medium").render(f"Frase correta: {target_phrase}", True, WHITE)
     correct_rect = correct_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 40))
-    WIN.blit(correct_text, correct_rect)
+    surface.blit(correct_text, correct_rect)
     
-    reason_text = FONT_MEDIUM.render("Tempo esgotado ou muitas tentativas", True, WHITE)
+    reason_text = get_font("medium").render("Tempo esgotado ou muitas tentativas", True, WHITE)
     reason_rect = reason_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-    WIN.blit(reason_text, reason_rect)
+    surface.blit(reason_text, reason_rect)
     
-    continue_text = FONT_SMALL.render("Pressione R para tentar novamente ou ESC para sair", True, LIGHT_GRAY)
+    continue_text = get_font("small").render("Pressione R para tentar novamente ou ESC para sair", True, LIGHT_GRAY)
     continue_rect = continue_text.get_rect(center=(WIDTH // 2, HEIGHT - 50))
-    WIN.blit(continue_text, continue_rect)
+    surface.blit(continue_text, continue_rect)
     
-    pygame.display.update()
+    return surface, surface.get_rect()
+
+MENU_SCENE = Scene([Widget(lambda: (game_state.language, tuple(game_state.corpus.languages())), render_language_menu)])
+
+PHRASE_BOX_WIDGET = Widget(phrase_box_key, render_phrase_box)
+
+GAME_SCENE = Scene(
+    [static_text("large", "Sequence Alignment Game", WHITE, center=(WIDTH // 2, 50))]
+    + [PHRASE_BOX_WIDGET]
+    + stat_widgets()
+    + [Widget(lambda: (game_state.feedback, game_state.similarity), render_feedback)]
+    + [Widget(lambda: (game_state.input_mode, game_state.shuffled_phrase), render_typing_letters)]
+    + control_widgets()
+)
+
+VICTORY_SCENE = Scene([Widget(victory_key, render_victory_screen)])
+
+GAME_OVER_SCENE = Scene([Widget(lambda: game_state.target_phrase, render_game_over_screen)])
+
+def active_scene():
+    if game_state.show_language_menu:
+        return MENU_SCENE
+    elif game_state.game_won:
+        return VICTORY_SCENE
+    elif game_state.game_over or game_state.attempts >= MAX_ATTEMPTS:
+        game_state.game_over = True
+        return GAME_OVER_SCENE
+    else:
+        return GAME_SCENE
+
+FRAME_PROFILER = FrameProfiler()
+PROFILED_PHASES = ["eventos", "update_feedback", "score_keystroke", "desenho", "draw_phrase_box", "overlay",
+                   "display.update"]
+
+def enable_profiling():
+    if FRAME_PROFILER.enabled:
+        return
+    FRAME_PROFILER.enable()
+    FRAME_PROFILER.instrument(game_state, "update_feedback", "update_feedback")
+    FRAME_PROFILER.instrument(game_state, "score_keystroke", "score_keystroke")
+    FRAME_PROFILER.instrument(PHRASE_BOX_WIDGET, "render_fn", "draw_phrase_box")
+
+class ProfilerOverlay:
+    # Painel de tempos por fase (F3). Fica por cima da cena: é copiado a
+    # cada quadro, mas o texto só é refeito a cada refresh_every quadros.
+    def __init__(self, rect, refresh_every=15):
+        self.rect = pygame.Rect(rect)
+        self.refresh_every = refresh_every
+        self.visible = False
+        self.surface = None
+        self.frames = 0
+    
+    def toggle(self):
+        self.visible = not self.visible
+        self.surface = None
+        return self.visible
+    
+    def draw(self, target):
+        self.frames += 1
+        dirty = []
+        if self.surface is None or self.frames >= self.refresh_every:
+            self.surface = self.render()
+            self.frames = 0
+            dirty.append(self.rect)
+        target.blit(self.surface, self.rect)
+        return dirty
+    
+    def render(self):
+        frame = FRAME_PROFILER.summary(FRAME_PROFILER.frame_times)
+        lines = [
+            f"Quadro p50/p95/p99: {frame['p50']:.1f}/{frame['p95']:.1f}/{frame['p99']:.1f} ms",
+            f"Quadros perdidos: {FRAME_PROFILER.dropped_in_window()}/{len(FRAME_PROFILER.frame_times)}"
+        ]
+        for phase in PROFILED_PHASES:
+            times = FRAME_PROFILER.phase_times.get(phase)
+            if times:
+                summary = FRAME_PROFILER.summary(times)
+                lines.append(f"{phase}: {summary['p50']:.2f} / {summary['p95']:.2f} ms")
+        
+        surface = pygame.Surface(self.rect.size).convert()
+        surface.fill(BLACK)
+        pygame.draw.rect(surface, GRAY, surface.get_rect(), 1)
+        for i, line in enumerate(lines):
+            surface.blit(get_font("small").render(line, True, YELLOW), (8, 6 + i * 17))
+        return surface
+
+PROFILER_OVERLAY = ProfilerOverlay((WIDTH - 330, HEIGHT - 177, 320, 167))
 
 def change_difficulty():
-    difficulties = list(DIFFICULTY_LEVELS.keys())
-    current_index = difficulties.index(game_state.difficulty)
-    next_index = (current_index + 1) % len(difficulties)
-    game_state.difficulty = difficulties[next_index]
+    game_state.change_difficulty()
 
 def change_language():
-    game_state.show_language_menu = True
+    game_state.change_language()
+
+def typing_active():
+    return (game_state.input_mode == "typing" and not game_state.show_language_menu
+            and not game_state.game_won and not game_state.game_over)
 
-def game_loop():
+def sync_text_input():
+    # Eventos TEXTINPUT (e o teclado virtual / IME) só no modo de digitação
+    if game_state.input_mode == "typing":
+        pygame.key.start_text_input()
+    else:
+        pygame.key.stop_text_input()
+
+def game_loop(headless=False, keep_display=False, profile=False):
+    init_display(headless)
+    for size in FONT_SIZES:
+        get_font(size)
+    if profile:
+        enable_profiling()
+    sync_text_input()
     clock = pygame.time.Clock()
     running = True
+    shown_scene = None
+    first_frame = True
     
     while running:
         clock.tick(60)
+        FRAME_PROFILER.start_frame()
         
-        if game_state.show_language_menu:
-            draw_language_menu()
-        elif game_state.game_won:
-            victory_screen()
-        elif game_state.game_over or game_state.attempts >= MAX_ATTEMPTS:
-            game_state.game_over = True
-            game_over_screen()
+        if first_frame:
+            with timed("primeiro quadro"):
+                shown_scene = active_scene()
+                shown_scene.refresh(WIN, redraw=True)
+                pygame.display.update()
+            first_frame = False
         else:
-            draw_game()
+            scene = active_scene()
+            dirty_rects = scene.refresh(WIN, redraw=scene is not shown_scene)
+            shown_scene = scene
+            FRAME_PROFILER.mark("desenho")
+            if PROFILER_OVERLAY.visible:
+                dirty_rects.extend(PROFILER_OVERLAY.draw(WIN))
+                FRAME_PROFILER.mark("overlay")
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            FRAME_PROFILER.mark("display.update")
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            
+            if event.type == pygame.VIDEOEXPOSE:
+                shown_scene = None
+                
+            if event.type == pygame.TEXTINPUT and typing_active():
+                for char in event.text:
+                    game_state.type_char(char)
+                # Mantém a última linha digitada à vista
+                scroll_phrase(phrase_layout().lines)
+            
+            if event.type == pygame.MOUSEWHEEL and not game_state.show_language_menu:
+                scroll_phrase(-event.y)
                 
             if event.type == pygame.KEYDOWN:
+                # Digitando, as letras são texto: os atalhos pedem Ctrl
+                shortcut = not typing_active() or event.mod & pygame.KMOD_CTRL
                 if event.key == pygame.K_ESCAPE:
                     running = False
+                elif event.key == pygame.K_TAB:
+                    if not game_state.show_language_menu:
+                        game_state.toggle_input_mode()
+                        sync_text_input()
+                elif event.key == pygame.K_BACKSPACE:
+                    if typing_active():
+                        game_state.backspace()
+                        scroll_phrase(phrase_layout().lines)
+                elif event.key == pygame.K_F3:
+                    if PROFILER_OVERLAY.toggle():
+                        enable_profiling()
+                    else:
+                        if not profile:
+                            FRAME_PROFILER.disable()
+                        shown_scene = None
+                elif not shortcut:
+                    pass
                 elif event.key == pygame.K_r:
                     if not game_state.show_language_menu:
                         game_state.new_game()
@@ -358,12 +663,33 @@ def game_loop():
                 elif event.key == pygame.K_l:
                     if not game_state.show_language_menu:
                         change_language()
+                elif event.key == pygame.K_h:
+                    if not game_state.show_language_menu:
+                        game_state.request_hint()
                     
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            # A roda do mouse também gera MOUSEBUTTONDOWN/UP (botões 4 e 5);
+            # só o botão esquerdo seleciona e troca blocos
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == pygame.BUTTON_LEFT:
                 if game_state.show_language_menu:
                     handle_language_menu_click(event.pos)
-                elif not game_state.game_won and not game_state.game_over:
+                elif not game_state.game_won and not game_state.game_over and game_state.input_mode == "swap":
                     handle_mouse_click(event.pos)
-    
-    pygame.quit()
+            
+            if event.type == pygame.MOUSEBUTTONUP and event.button == pygame.BUTTON_LEFT:
+                if not game_state.show_language_menu and not game_state.game_won and not game_state.game_over:
+                    handle_mouse_release(event.pos)
+            
+            if event.type == pygame.MOUSEMOTION:
+                if (not game_state.show_language_menu and not game_state.game_won and not game_state.game_over
+                        and game_state.input_mode == "swap"):
+                    handle_mouse_motion(event.pos)
+        
+        FRAME_PROFILER.mark("eventos")
+    
+    if not profile:
+        FRAME_PROFILER.disable()
+    if keep_display:
+        pygame.display.iconify()
+    else:
+        shutdown_display()
 
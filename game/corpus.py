@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Corpus de frases indexado para o Sequence Alignment Game
+
+O arquivo guarda as frases em UTF-8 num único bloco de dados e, para cada
+grupo (idioma, faixa de tamanho, dificuldade), um índice compacto com o
+deslocamento e o tamanho de cada frase. A leitura usa mmap: sortear uma
+frase lê só o índice e os bytes dela, sem carregar o corpus na memória.
+
+Uso:
+    python corpus.py build frases.jsonl frases.corpus
+    python corpus.py info frases.corpus
+"""
+
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+
+from constants import PHRASES
+
+MAGIC = b"SAGCORP1"
+HEADER = struct.Struct("<8sI")
+
+def length_bucket(length):
+    """Faixa de tamanho da frase: 1, 2-3, 4-7, 8-15, 16-31, ..."""
+    return length.bit_length()
+
+def _matching_groups(groups, language, difficulty, bucket):
+    # Frases sem dificuldade ("") servem para qualquer dificuldade
+    return [
+        group for group in groups
+        if group["language"] == language
+        and (difficulty is None or group["difficulty"] in (difficulty, ""))
+        and (bucket is None or group["bucket"] == bucket)
+    ]
+
+class BuiltinCorpus:
+    """Corpus padrão com as frases de constants.PHRASES"""
+
+    def __init__(self, phrases=PHRASES):
+        self.phrases = phrases
+
+    def languages(self):
+        return list(self.phrases.keys())
+
+    def count(self, language):
+        return len(self.phrases.get(language, []))
+
+    def sample(self, language, difficulty=None, bucket=None, rng=random):
+        phrases = self.phrases[language]
+        if bucket is not None:
+            phrases = [phrase for phrase in phrases if length_bucket(len(phrase)) == bucket] or phrases
+        return rng.choice(phrases)
+
+    def iter_phrases(self):
+        for language, phrases in self.phrases.items():
+            for phrase in phrases:
+                yield language, phrase, ""
+
+    def close(self):
+        pass
+
+class PhraseCorpus:
+    """Corpus lido de um arquivo gerado por build_corpus, via mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, directory_length = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} não é um corpus do Sequence Alignment Game")
+
+        directory = json.loads(self.data[HEADER.size:HEADER.size + directory_length].decode("utf-8"))
+        self.groups = directory["groups"]
+        self.index_offset = HEADER.size + directory_length
+        self.data_offset = self.index_offset + directory["index_size"]
+
+    def languages(self):
+        languages = []
+        for group in self.groups:
+            if group["language"] not in languages:
+                languages.append(group["language"])
+        return languages
+
+    def count(self, language):
+        return sum(group["count"] for group in self.groups if group["language"] == language)
+
+    def sample(self, language, difficulty=None, bucket=None, rng=random):
+        groups = _matching_groups(self.groups, language, difficulty, bucket)
+        if not groups:
+            groups = _matching_groups(self.groups, language, None, None)
+        if not groups:
+            raise KeyError(language)
+
+        position = rng.randrange(sum(group["count"] for group in groups))
+        for group in groups:
+            if position < group["count"]:
+                return self.phrase(group, position)
+            position -= group["count"]
+
+    def iter_phrases(self):
+        for group in self.groups:
+            for position in range(group["count"]):
+                yield group["language"], self.phrase(group, position), group["difficulty"]
+
+    def phrase(self, group, position):
+        (offset,) = struct.unpack_from("<Q", self.data, self.index_offset + group["offsets"] + position * 8)
+        (length,) = struct.unpack_from("<I", self.data, self.index_offset + group["lengths"] + position * 4)
+        start = self.data_offset + offset
+        return self.data[start:start + length].decode("utf-8")
+
+    def close(self):
+        if getattr(self, "data", None) is not None:
+            self.data.close()
+            self.data = None
+        self.file.close()
+
+def little_endian_bytes(values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def build_corpus(entries, path):
+    """Gera o arquivo de corpus a partir de (idioma, frase, dificuldade)
+
+    As frases vão direto para um arquivo temporário; na memória ficam só
+    os índices (12 bytes por frase).
+    """
+    groups = {}
+    data_path = path + ".data"
+    offset = 0
+
+    with open(data_path, "wb") as data_file:
+        for language, phrase, difficulty in entries:
+            encoded = phrase.encode("utf-8")
+            key = (language, length_bucket(len(phrase)), difficulty or "")
+            offsets, lengths = groups.setdefault(key, (array("Q"), array("I")))
+            offsets.append(offset)
+            lengths.append(len(encoded))
+            data_file.write(encoded)
+            offset += len(encoded)
+
+    # Deslocamentos dos índices são relativos ao início da seção de
+    # índices, logo após o diretório; os dados vêm depois dos índices.
+    directory = {"groups": [], "index_size": 0}
+    for (language, bucket, difficulty), (offsets, lengths) in sorted(groups.items()):
+        directory["groups"].append({
+            "language": language,
+            "bucket": bucket,
+            "difficulty": difficulty,
+            "count": len(offsets),
+            "offsets": directory["index_size"],
+            "lengths": directory["index_size"] + 8 * len(offsets)
+        })
+        directory["index_size"] += 12 * len(offsets)
+    encoded_directory = json.dumps(directory, ensure_ascii=False).encode("utf-8")
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as corpus_file:
+        corpus_file.write(HEADER.pack(MAGIC, len(encoded_directory)))
+        corpus_file.write(encoded_directory)
+        for key in sorted(groups):
+            offsets, lengths = groups[key]
+            corpus_file.write(little_endian_bytes(offsets))
+            corpus_file.write(little_endian_bytes(lengths))
+        with open(data_path, "rb") as data_file:
+            while True:
+                chunk = data_file.read(1 << 20)
+                if not chunk:
+                    break
+                corpus_file.write(chunk)
+    os.replace(temporary_path, path)
+    os.remove(data_path)
+
+def read_entries(path):
+    """Lê um JSONL com language, phrase e (opcionalmente) difficulty"""
+    with open(path, "r", encoding="utf-8") as entries_file:
+        for line in entries_file:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                yield entry["language"], entry["phrase"], entry.get("difficulty", "")
+
+def load_corpus(path=None):
+    """Abre o corpus do arquivo, ou o corpus embutido se path for None"""
+    if path is None:
+        return BuiltinCorpus()
+    return PhraseCorpus(path)
+
+def main():
+    """Função principal"""
+    if len(sys.argv) == 4 and sys.argv[1] == "build":
+        build_corpus(read_entries(sys.argv[2]), sys.argv[3])
+        print(f"✓ Corpus gerado em {sys.argv[3]}")
+    elif len(sys.argv) == 3 and sys.argv[1] == "info":
+        corpus = PhraseCorpus(sys.argv[2])
+        for language in corpus.languages():
+            print(f"{language}: {corpus.count(language)} frases")
+        for group in corpus.groups:
+            difficulty = group["difficulty"] or "-"
+            print(f"  faixa {group['bucket']:2d} | dificuldade {difficulty:8s} | {group['count']} frases")
+        corpus.close()
+    else:
+        print(__doc__)
+
+if __name__ == "__main__":
+    main()
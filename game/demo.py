@@ -5,7 +5,7 @@ Mostra todas as funcionalidades implementadas
 """
 
 import time
-from sequence_alignment import levenshtein_distance, calculate_similarity, get_feedback, shuffle_string
+from sequence_alignment import levenshtein_distance, calculate_similarity, get_feedback, shuffle_string, batch_distance
 from constants import PHRASES, DIFFICULTY_LEVELS
 
 def print_header(title):
@@ -32,11 +32,14 @@ def demo_difficulty_levels():
     print(f"Frase de teste: '{test_phrase}'")
     print()
     
-    for difficulty_name, difficulty_value in DIFFICULTY_LEVELS.items():
-        shuffled = shuffle_string(test_phrase, difficulty_value)
-        distance = levenshtein_distance(test_phrase, shuffled)
-        similarity = calculate_similarity(test_phrase, shuffled)
-        
+    shuffled_phrases = [
+        shuffle_string(test_phrase, difficulty_value)
+        for difficulty_value in DIFFICULTY_LEVELS.values()
+    ]
+    distances, similarities = batch_distance(test_phrase, shuffled_phrases)
+    
+    for (difficulty_name, difficulty_value), shuffled, distance, similarity in zip(
+            DIFFICULTY_LEVELS.items(), shuffled_phrases, distances, similarities):
         print(f"{difficulty_name} ({difficulty_value:.0%} embaralhamento):")
         print(f"  Embaralhada: '{shuffled}'")
         print(f"  Distância: {distance} operações")
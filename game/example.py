@@ -4,7 +4,7 @@ Exemplo de uso do algoritmo de Sequence Alignment
 Demonstra como funciona a distância de Levenshtein com múltiplos idiomas
 """
 
-from sequence_alignment import levenshtein_distance, calculate_similarity, get_feedback, shuffle_string
+from sequence_alignment import levenshtein_distance, calculate_similarity, get_feedback, shuffle_string, batch_distance
 from constants import PHRASES
 import random
 
@@ -48,11 +48,12 @@ def demonstrate_sequence_alignment():
         print(f"\n{language}:")
         target = random.choice(phrases)
         
-        for difficulty in [0.3, 0.5, 0.7]:
-            shuffled = shuffle_string(target, difficulty)
-            distance = levenshtein_distance(target, shuffled)
-            similarity = calculate_similarity(target, shuffled)
-            
+        difficulties = [0.3, 0.5, 0.7]
+        shuffled_phrases = [shuffle_string(target, difficulty) for difficulty in difficulties]
+        distances, similarities = batch_distance(target, shuffled_phrases)
+        
+        for difficulty, shuffled, distance, similarity in zip(
+                difficulties, shuffled_phrases, distances, similarities):
             print(f"  Dificuldade {difficulty:.0%}:")
             print(f"    Original:     '{target}'")
             print(f"    Embaralhada:  '{shuffled}'")
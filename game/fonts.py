@@ -0,0 +1,74 @@
+import json
+import os
+import pygame
+from constants import FONT_MANIFEST
+
+class FontResolver:
+    # Resolve nomes de fonte do sistema para arquivos e guarda o resultado
+    # num manifesto JSON por (nome, tamanho). Em execuções seguintes o
+    # arquivo é aberto direto, sem a enumeração de fontes do SysFont.
+    # Quando a fonte não existe, a fonte embutida do pygame é usada. A
+    # falta só é lembrada até o fim da execução (missing), nunca no
+    # manifesto: a fonte pode ser instalada, ou o fc-list voltar a
+    # funcionar, antes da próxima.
+    def __init__(self, manifest_path=FONT_MANIFEST):
+        self.manifest_path = manifest_path
+        self.manifest = self.load_manifest()
+        self.missing = set()
+    
+    def load_manifest(self):
+        if self.manifest_path is None:
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+    
+    def save_manifest(self):
+        if self.manifest_path is None:
+            return
+        temporary_path = self.manifest_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+                json.dump(self.manifest, manifest_file, indent=2, sort_keys=True)
+            os.replace(temporary_path, self.manifest_path)
+        except OSError:
+            pass
+    
+    def resolve(self, name, size):
+        key = f"{name}:{size}"
+        path = self.manifest.get(key)
+        if path is not None and os.path.exists(path):
+            return path
+        if name in self.missing:
+            return None
+        
+        path = pygame.font.match_font(name)
+        if path is None:
+            self.forget(name, key)
+            return None
+        self.manifest[key] = path
+        self.save_manifest()
+        return path
+    
+    def forget(self, name, key):
+        # Manifestos antigos podem ter null ou um caminho que sumiu
+        self.missing.add(name)
+        if key in self.manifest:
+            del self.manifest[key]
+            self.save_manifest()
+    
+    def load(self, name, size):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        
+        path = self.resolve(name, size)
+        if path is not None:
+            try:
+                return pygame.font.Font(path, size)
+            except (OSError, pygame.error):
+                self.forget(name, f"{name}:{size}")
+        return pygame.font.Font(None, size)
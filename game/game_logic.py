@@ -0,0 +1,202 @@
+import time
+from block_status import BlockStatuses
+from constants import *
+from corpus import BuiltinCorpus
+from records import RecordStore
+from sequence_alignment import IncrementalScorer, PreparedTarget, prepare_target, shuffle_string
+from solver import best_swap
+
+# Estado e regras do jogo, sem nenhuma dependência do pygame: pode ser
+# importado por simulações, testes e ferramentas em lote sem abrir janela.
+
+def shuffle_round(target, difficulty_value):
+    # Como em puzzles.make_puzzle: com duas letras diferentes a frase
+    # embaralhada nunca é o próprio alvo (a partida não começa ganha).
+    # Frases curtas demais para uma troca no nível usam uma embaralhada
+    # completa.
+    if len(set(target)) < 2:
+        return target
+    if int(len(target) * difficulty_value) == 0:
+        difficulty_value = 1.0
+    while True:
+        shuffled = shuffle_string(target, difficulty_value)
+        if shuffled != target:
+            return shuffled
+
+class GameState:
+    def __init__(self, records=None, corpus=None, puzzles=None):
+        self.target_phrase = ""
+        self.prepared_target = PreparedTarget("")
+        self.scorer = IncrementalScorer(self.prepared_target)
+        self.current_phrase = ""
+        self.blocks = BlockStatuses("")
+        self.shuffled_phrase = ""
+        self.difficulty = "Médio"
+        self.language = "Português"
+        self.attempts = 0
+        self.start_time = time.time()
+        self.similarity = 0.0
+        self.distance = 0
+        self.feedback = ""
+        self.result = None
+        self.game_won = False
+        self.game_over = False
+        self.selected_char_index = -1
+        self.hover_char_index = -1
+        self.drag_char_index = -1
+        self.first_line = 0
+        self.records = records if records is not None else RecordStore(limit=RECORDS_PER_GROUP)
+        self.show_language_menu = True
+        self.victory_time = None
+        self.corpus = corpus if corpus is not None else BuiltinCorpus()
+        self.puzzles = puzzles
+        self.min_swaps = None
+        self.hint = None
+        self.hints_used = 0
+        # "swap": troca letras da frase embaralhada; "typing": digita a
+        # frase do zero, com as letras embaralhadas só como referência
+        self.input_mode = "swap"
+        
+    def new_game(self):
+        puzzle = None
+        if self.puzzles is not None:
+            puzzle = self.puzzles.sample(self.language, self.difficulty)
+        
+        if puzzle is not None:
+            # Desafio pré-pontuado: nada a embaralhar nem a calcular aqui
+            self.target_phrase = puzzle.target
+            self.shuffled_phrase = puzzle.shuffled
+            self.min_swaps = puzzle.swaps
+        else:
+            self.target_phrase = self.corpus.sample(self.language, self.difficulty)
+            difficulty_value = DIFFICULTY_LEVELS[self.difficulty]
+            self.shuffled_phrase = shuffle_round(self.target_phrase, difficulty_value)
+            self.min_swaps = None
+        
+        self.prepared_target = prepare_target(self.target_phrase, DIFFICULTY_METRICS[self.difficulty])
+        self.scorer = IncrementalScorer(self.prepared_target)
+        prescored = puzzle is not None and self.input_mode == "swap"
+        if prescored:
+            self.scorer.reset(puzzle.shuffled, puzzle.distance)
+        self.current_phrase = self.starting_phrase()
+        self.blocks = BlockStatuses(self.target_phrase, self.current_phrase)
+        self.attempts = 0
+        self.start_time = time.time()
+        self.game_won = False
+        self.game_over = False
+        self.selected_char_index = -1
+        self.hover_char_index = -1
+        self.drag_char_index = -1
+        self.first_line = 0
+        self.victory_time = None
+        self.hint = None
+        self.hints_used = 0
+        if prescored:
+            self.apply_result(self.scorer.result())
+        else:
+            self.update_feedback()
+        
+    def starting_phrase(self):
+        return "" if self.input_mode == "typing" else self.shuffled_phrase
+        
+    def toggle_input_mode(self):
+        # Recomeça a mesma frase no outro modo
+        self.input_mode = "typing" if self.input_mode == "swap" else "swap"
+        self.current_phrase = self.starting_phrase()
+        self.blocks = BlockStatuses(self.target_phrase, self.current_phrase)
+        self.selected_char_index = -1
+        self.hover_char_index = -1
+        self.drag_char_index = -1
+        self.first_line = 0
+        self.hint = None
+        self.update_feedback()
+        
+    def type_char(self, char):
+        if self.input_mode != "typing" or self.game_won or self.game_over:
+            return
+        if len(self.current_phrase) >= len(self.target_phrase) + TYPING_SLACK:
+            return
+        self.current_phrase += char
+        self.blocks.push(char)
+        self.score_keystroke(char)
+        
+    def backspace(self):
+        if self.input_mode != "typing" or self.game_won or self.game_over or not self.current_phrase:
+            return
+        self.current_phrase = self.current_phrase[:-1]
+        self.blocks.pop()
+        self.score_keystroke()
+        
+    def score_keystroke(self, char=None):
+        # Uma coluna da DP por tecla: push do caractere digitado ou pop
+        # no backspace (char=None). É a contraparte de update_feedback no
+        # modo de digitação e é cronometrada do mesmo jeito pelo perfil.
+        if char is None:
+            self.scorer.pop()
+        else:
+            self.scorer.push(char)
+        self.apply_result(self.scorer.result(), moved=True)
+        
+    def update_feedback(self, changed_from=0, moved=False):
+        self.scorer.update(self.current_phrase, changed_from)
+        self.apply_result(self.scorer.result(), moved)
+        
+    def apply_result(self, result, moved=False):
+        # Só uma vitória feita por uma jogada (moved) entra nos recordes;
+        # uma frase que já começa certa não conta como tempo
+        self.result = result
+        self.feedback = self.result.message
+        self.similarity = self.result.similarity
+        self.distance = self.result.distance
+        if self.similarity == 1.0 and not self.game_won:
+            self.game_won = True
+            self.victory_time = time.time() - self.start_time
+            if moved:
+                self.records.add(self.language, self.difficulty, self.victory_time)
+        
+    def swap_chars(self, index1, index2):
+        if 0 <= index1 < len(self.current_phrase) and 0 <= index2 < len(self.current_phrase):
+            chars = list(self.current_phrase)
+            chars[index1], chars[index2] = chars[index2], chars[index1]
+            self.current_phrase = ''.join(chars)
+            self.blocks.swap(index1, index2)
+            self.attempts += 1
+            self.hint = None
+            self.update_feedback(min(index1, index2), moved=True)
+        
+    def request_hint(self, time_budget=HINT_TIME_BUDGET):
+        # Cabe num quadro: a busca para no prazo e devolve a troca gulosa
+        if self.game_won or self.game_over or self.input_mode != "swap":
+            return None
+        self.hint = best_swap(self.current_phrase, self.target_phrase, time_budget)
+        if self.hint is not None:
+            self.hints_used += 1
+        return self.hint
+        
+    def set_corpus(self, corpus):
+        self.corpus = corpus
+        languages = corpus.languages()
+        if self.language not in languages:
+            self.language = languages[0]
+        
+    def select_language(self, language):
+        self.language = language
+        self.show_language_menu = False
+        self.new_game()
+        
+    def change_difficulty(self):
+        difficulties = list(DIFFICULTY_LEVELS.keys())
+        current_index = difficulties.index(self.difficulty)
+        next_index = (current_index + 1) % len(difficulties)
+        self.difficulty = difficulties[next_index]
+        
+    def change_language(self):
+        self.show_language_menu = True
+        
+    def check_time_limit(self):
+        if self.game_won and self.victory_time is not None:
+            return self.victory_time
+        elapsed_time = time.time() - self.start_time
+        if elapsed_time > TIME_LIMIT:
+            self.game_over = True
+        return elapsed_time
@@ -0,0 +1,85 @@
+class PhraseLayout:
+    # Geometria dos blocos de uma frase dentro da caixa de frase. É
+    # calculada uma vez por tamanho de frase e compartilhada pelo desenho
+    # e pelo mouse: posição de bloco e bloco sob o cursor saem de contas,
+    # sem percorrer os blocos.
+    #
+    # Frases que não cabem numa linha quebram em várias linhas alinhadas
+    # na mesma grade; a caixa cresce para baixo quando precisa, até
+    # max_height. Se nem assim couber, os blocos diminuem (scales) e, no
+    # menor tamanho, só visible_lines linhas aparecem de cada vez: as
+    # funções de posição recebem a primeira linha visível (first_line).
+    def __init__(self, length, x, y, width, height,
+                 block_width=25, block_height=35, block_margin=3,
+                 line_margin=8, padding=10, title_height=40,
+                 max_height=None, scales=(1.0, 0.75, 0.5)):
+        self.length = length
+        self.x = x
+        self.y = y
+        self.width = width
+
+        for scale in scales:
+            self.block_width = round(block_width * scale)
+            self.block_height = round(block_height * scale)
+            self.step_x = self.block_width + block_margin
+            self.step_y = self.block_height + round(line_margin * scale)
+
+            self.per_line = max(1, (width - 2 * padding + block_margin) // self.step_x)
+            self.lines = max(1, -(-length // self.per_line))
+            grid_height = self.lines * self.step_y - (self.step_y - self.block_height)
+            if max_height is None or title_height + grid_height + padding <= max_height:
+                break
+
+        self.visible_lines = self.lines
+        if max_height is not None and title_height + grid_height + padding > max_height:
+            self.visible_lines = max(1, (max_height - title_height - padding + self.step_y - self.block_height)
+                                     // self.step_y)
+            grid_height = self.visible_lines * self.step_y - (self.step_y - self.block_height)
+
+        columns = min(length, self.per_line)
+        grid_width = columns * self.step_x - block_margin
+
+        self.height = max(height, title_height + grid_height + padding)
+        self.start_x = x + (width - grid_width) // 2
+        self.start_y = y + (self.height - self.block_height) // 2 + 20 - (grid_height - self.block_height) // 2
+
+    @property
+    def max_first_line(self):
+        return self.lines - self.visible_lines
+
+    def clamp_first_line(self, first_line):
+        return max(0, min(first_line, self.max_first_line))
+
+    def visible_range(self, first_line=0):
+        start = first_line * self.per_line
+        return range(start, min(self.length, start + self.visible_lines * self.per_line))
+
+    @property
+    def rect(self):
+        return (self.x, self.y, self.width, self.height)
+
+    def block_position(self, index, first_line=0):
+        row, column = divmod(index, self.per_line)
+        return (self.start_x + column * self.step_x, self.start_y + (row - first_line) * self.step_y)
+
+    def block_offset(self, index, first_line=0):
+        block_x, block_y = self.block_position(index, first_line)
+        return (block_x - self.x, block_y - self.y)
+
+    def index_at(self, pos, first_line=0):
+        offset_x = pos[0] - self.start_x
+        offset_y = pos[1] - self.start_y
+        if offset_x < 0 or offset_y < 0:
+            return None
+
+        column, inside_x = divmod(offset_x, self.step_x)
+        row, inside_y = divmod(offset_y, self.step_y)
+        if inside_x > self.block_width or inside_y > self.block_height:
+            return None
+        if column >= self.per_line or row >= self.visible_lines:
+            return None
+
+        index = (row + first_line) * self.per_line + column
+        if index >= self.length:
+            return None
+        return index
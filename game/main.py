@@ -1,5 +1,41 @@
-from core import game_loop
+import argparse
+import sys
+from startup import timed, startup_report
 
-if __name__ == "__main__":
-    game_loop()
+with timed("import pygame"):
+    import pygame
+
+with timed("import core"):
+    import core
+    from corpus import load_corpus
+    from puzzles import PuzzleBank
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sequence Alignment Game")
+    parser.add_argument("--headless", action="store_true",
+                        help="roda sem janela usando o driver de vídeo dummy do SDL")
+    parser.add_argument("--corpus", help="arquivo de corpus gerado por corpus.py (padrão: frases embutidas)")
+    parser.add_argument("--puzzles", help="banco de desafios gerado por puzzles.py")
+    parser.add_argument("--profile", metavar="ARQUIVO",
+                        help="grava ao sair os tempos por fase de cada quadro (JSON) ou, "
+                             "com extensão .pstats/.prof, o perfil do cProfile")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="mostra ao sair quanto tempo cada fase da inicialização levou")
+    args = parser.parse_args()
+    if args.corpus:
+        core.game_state.set_corpus(load_corpus(args.corpus))
+    if args.puzzles:
+        core.game_state.puzzles = PuzzleBank(args.puzzles)
+    if args.profile and args.profile.endswith((".pstats", ".prof")):
+        import cProfile
+        profile = cProfile.Profile()
+        profile.runcall(core.game_loop, headless=args.headless)
+        profile.dump_stats(args.profile)
+    else:
+        core.game_loop(headless=args.headless, profile=bool(args.profile))
+        if args.profile:
+            core.FRAME_PROFILER.dump(args.profile)
+    if args.profile:
+        print(f"✓ Perfil salvo em {args.profile}", file=sys.stderr)
+    if args.startup_report:
+        print(startup_report(), file=sys.stderr)
@@ -0,0 +1,133 @@
+import json
+import time
+from collections import deque
+
+from batch import percentile
+
+# Cronômetros por fase do laço principal. Desligado, cada marca é só um
+# teste de self.enabled; os cronômetros de funções internas (instrument)
+# só existem enquanto o perfil está ligado.
+#
+# As fases de primeiro nível (eventos, desenho, display.update, ...) são
+# medidas por quadro; as internas, como update_feedback dentro de eventos,
+# são medidas por chamada e descontadas da fase em que aconteceram.
+
+class FrameProfiler:
+    def __init__(self, window=600, frame_budget=1 / 60):
+        self.window = window
+        self.frame_budget = frame_budget
+        self.enabled = False
+        self.instrumented = []
+        self.reset()
+
+    def reset(self):
+        self.frame_times = deque(maxlen=self.window)
+        self.phase_times = {}
+        self.totals = {}
+        self.frames = 0
+        self.dropped = 0
+        self.frame_start = None
+        self.last_mark = None
+        self.current = {}
+        self.nested = 0.0
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.frame_start = None
+        for owner, attribute, original, own_attribute in reversed(self.instrumented):
+            if own_attribute:
+                setattr(owner, attribute, original)
+            else:
+                delattr(owner, attribute)
+        self.instrumented = []
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self._finish_frame(now)
+        self.frame_start = self.last_mark = now
+        self.current = {}
+        self.nested = 0.0
+
+    def mark(self, phase):
+        # Fecha a fase que terminou agora (desde a marca anterior)
+        if not self.enabled or self.last_mark is None:
+            return
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + now - self.last_mark - self.nested
+        self.last_mark = now
+        self.nested = 0.0
+
+    def instrument(self, owner, attribute, phase):
+        # Troca owner.attribute por uma versão cronometrada até disable()
+        original = getattr(owner, attribute)
+        own_attribute = attribute in vars(owner)
+
+        def timed_call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.nested += elapsed
+                self._record(phase, elapsed)
+
+        setattr(owner, attribute, timed_call)
+        self.instrumented.append((owner, attribute, original, own_attribute))
+
+    def _finish_frame(self, now):
+        interval = now - self.frame_start
+        self.frame_times.append(interval)
+        self.frames += 1
+        if interval > 1.5 * self.frame_budget:
+            self.dropped += 1
+        for phase, seconds in self.current.items():
+            self._record(phase, seconds)
+
+    def _record(self, phase, seconds):
+        times = self.phase_times.get(phase)
+        if times is None:
+            times = self.phase_times[phase] = deque(maxlen=self.window)
+            self.totals[phase] = [0, 0.0, 0.0]
+        times.append(seconds)
+        totals = self.totals[phase]
+        totals[0] += 1
+        totals[1] += seconds
+        if seconds > totals[2]:
+            totals[2] = seconds
+
+    def summary(self, times):
+        # p50/p95/p99 em milissegundos da janela recente
+        values = sorted(times)
+        return {f"p{point}": (percentile(values, point) or 0.0) * 1000 for point in (50, 95, 99)}
+
+    def dropped_in_window(self):
+        return sum(1 for interval in self.frame_times if interval > 1.5 * self.frame_budget)
+
+    def report(self):
+        phases = {}
+        for phase, (calls, total, longest) in self.totals.items():
+            phases[phase] = dict(
+                calls=calls,
+                total_ms=total * 1000,
+                mean_ms=total / calls * 1000,
+                max_ms=longest * 1000,
+                **self.summary(self.phase_times[phase])
+            )
+        return {
+            "frames": self.frames,
+            "dropped_frames": self.dropped,
+            "frame_budget_ms": self.frame_budget * 1000,
+            "frame_ms": self.summary(self.frame_times),
+            "phases": phases
+        }
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.report(), report_file, ensure_ascii=False, indent=2)
+            report_file.write("\n")
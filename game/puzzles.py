@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Banco de desafios pré-calculados do Sequence Alignment Game
+
+Para cada frase do corpus e cada nível de DIFFICULTY_LEVELS, o gerador
+sorteia alguns embaralhamentos, descarta os que são iguais à frase alvo e
+guarda o que chega mais perto da distância esperada para o nível, junto
+com a distância exata (na métrica de DIFFICULTY_METRICS do nível) e o
+número mínimo de trocas. O arquivo binário é
+lido via mmap, então new_game sorteia um desafio em O(1).
+
+Uso:
+    python puzzles.py build desafios.bank [--corpus frases.corpus] [--workers N] [--seed S]
+    python puzzles.py info desafios.bank
+"""
+
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+from array import array
+from collections import namedtuple
+
+from batch import chunked, map_chunks
+from constants import DIFFICULTY_LEVELS, DIFFICULTY_METRICS
+from corpus import HEADER, little_endian_bytes, load_corpus
+from sequence_alignment import prepare_target, shuffle_string
+from solver import min_swaps
+
+MAGIC = b"SAGPUZL2"
+CANDIDATES = 8
+FIELDS = (("offsets", "Q"), ("target_lengths", "I"), ("shuffled_lengths", "I"),
+          ("distances", "I"), ("swaps", "I"))
+
+Puzzle = namedtuple("Puzzle", ["target", "shuffled", "distance", "swaps"])
+
+def target_distance(length, difficulty_value):
+    """Distância esperada para o nível: uma fração do tamanho da frase"""
+    return min(length, max(1, round(difficulty_value * length)))
+
+def make_puzzle(target, difficulty_name, difficulty_value, seed):
+    """Escolhe o melhor embaralhamento entre CANDIDATES tentativas (ou
+    mais, até um deles diferir do alvo)"""
+    if len(set(target)) < 2:
+        # Nenhum embaralhamento difere do alvo
+        return None
+    rng = random.Random(f"{seed}:{difficulty_name}:{target}")
+    prepared = prepare_target(target, DIFFICULTY_METRICS[difficulty_name])
+    wanted = target_distance(len(target), difficulty_value)
+    # Frases curtas demais para uma troca no nível usam uma embaralhada
+    # completa, como game_logic.shuffle_round
+    if int(len(target) * difficulty_value) == 0:
+        difficulty_value = 1.0
+
+    best = None
+    tries = 0
+    while best is None or tries < CANDIDATES:
+        tries += 1
+        shuffled = shuffle_string(target, difficulty_value, rng)
+        if shuffled == target:
+            continue
+        distance = prepared.distance(shuffled)
+        if best is None or abs(distance - wanted) < abs(best[1] - wanted):
+            best = (shuffled, distance)
+
+    shuffled, distance = best
+    return Puzzle(target, shuffled, distance, min_swaps(shuffled, target))
+
+def make_puzzles(entries, seed):
+    """Gera os desafios de um bloco de frases (roda num processo do pool)"""
+    results = []
+    for language, phrase, _ in entries:
+        for difficulty_name, difficulty_value in DIFFICULTY_LEVELS.items():
+            puzzle = make_puzzle(phrase, difficulty_name, difficulty_value, seed)
+            if puzzle is not None:
+                results.append((language, difficulty_name, puzzle))
+    return results
+
+def build_bank(corpus, path, workers=None, seed=0, chunk_size=500):
+    """Gera o banco de desafios em paralelo e grava no arquivo path"""
+    groups = {}
+    data_path = path + ".data"
+    offset = 0
+    chunks = chunked(corpus.iter_phrases(), chunk_size)
+
+    with open(data_path, "wb") as data_file:
+        for _, results in map_chunks(make_puzzles, chunks, workers, seed):
+            for language, difficulty_name, puzzle in results:
+                target = puzzle.target.encode("utf-8")
+                shuffled = puzzle.shuffled.encode("utf-8")
+                columns = groups.setdefault(
+                    (language, difficulty_name),
+                    [array(typecode) for _, typecode in FIELDS]
+                )
+                for column, value in zip(columns, (offset, len(target), len(shuffled),
+                                                   puzzle.distance, puzzle.swaps)):
+                    column.append(value)
+                data_file.write(target)
+                data_file.write(shuffled)
+                offset += len(target) + len(shuffled)
+
+    directory = {"groups": [], "index_size": 0}
+    for (language, difficulty_name), columns in sorted(groups.items()):
+        group = {"language": language, "difficulty": difficulty_name, "count": len(columns[0])}
+        for (field, _), column in zip(FIELDS, columns):
+            group[field] = directory["index_size"]
+            directory["index_size"] += column.itemsize * len(column)
+        directory["groups"].append(group)
+    encoded_directory = json.dumps(directory, ensure_ascii=False).encode("utf-8")
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as bank_file:
+        bank_file.write(HEADER.pack(MAGIC, len(encoded_directory)))
+        bank_file.write(encoded_directory)
+        for key in sorted(groups):
+            for column in groups[key]:
+                bank_file.write(little_endian_bytes(column))
+        with open(data_path, "rb") as data_file:
+            while True:
+                chunk = data_file.read(1 << 20)
+                if not chunk:
+                    break
+                bank_file.write(chunk)
+    os.replace(temporary_path, path)
+    os.remove(data_path)
+
+class PuzzleBank:
+    """Banco de desafios lido via mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, directory_length = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} não é um banco de desafios do Sequence Alignment Game")
+
+        directory = json.loads(self.data[HEADER.size:HEADER.size + directory_length].decode("utf-8"))
+        self.index_offset = HEADER.size + directory_length
+        self.data_offset = self.index_offset + directory["index_size"]
+        self.groups = {(group["language"], group["difficulty"]): group for group in directory["groups"]}
+
+    def has(self, language, difficulty):
+        return (language, difficulty) in self.groups
+
+    def _field(self, group, field, typecode, position):
+        size = 8 if typecode == "Q" else 4
+        (value,) = struct.unpack_from("<" + typecode, self.data,
+                                      self.index_offset + group[field] + position * size)
+        return value
+
+    def puzzle(self, group, position):
+        offset, target_length, shuffled_length, distance, swaps = (
+            self._field(group, field, typecode, position) for field, typecode in FIELDS
+        )
+        start = self.data_offset + offset
+        target = self.data[start:start + target_length].decode("utf-8")
+        start += target_length
+        shuffled = self.data[start:start + shuffled_length].decode("utf-8")
+        return Puzzle(target, shuffled, distance, swaps)
+
+    def sample(self, language, difficulty, rng=random):
+        group = self.groups.get((language, difficulty))
+        if group is None:
+            return None
+        return self.puzzle(group, rng.randrange(group["count"]))
+
+    def close(self):
+        if getattr(self, "data", None) is not None:
+            self.data.close()
+            self.data = None
+        self.file.close()
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Banco de desafios pré-calculados")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="gera o banco a partir de um corpus")
+    build_parser.add_argument("output")
+    build_parser.add_argument("--corpus", help="arquivo gerado por corpus.py (padrão: frases embutidas)")
+    build_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    build_parser.add_argument("--seed", default="0")
+    build_parser.add_argument("--chunk-size", type=int, default=500)
+
+    info_parser = subparsers.add_parser("info", help="mostra quantos desafios há por grupo")
+    info_parser.add_argument("bank")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        corpus = load_corpus(args.corpus)
+        build_bank(corpus, args.output, args.workers, args.seed, args.chunk_size)
+        corpus.close()
+        print(f"✓ Banco de desafios gerado em {args.output}")
+    else:
+        bank = PuzzleBank(args.bank)
+        for (language, difficulty), group in sorted(bank.groups.items()):
+            print(f"{language} | {difficulty:8s} | {group['count']} desafios")
+        bank.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import heapq
+import json
+import os
+
+class RecordStore:
+    # Guarda os K melhores tempos por (idioma, dificuldade). Cada grupo é
+    # um heap de máximo limitado (tempos negados), então inserir custa
+    # O(log K) e o pior tempo guardado está sempre no topo.
+    #
+    # Com path, cada novo recorde é anexado como uma linha JSON; quando o
+    # arquivo acumula linhas demais ele é reescrito só com os recordes
+    # atuais num arquivo temporário e trocado com os.replace.
+    def __init__(self, path=None, limit=5):
+        self.path = path
+        self.limit = limit
+        self.heaps = {}
+        self.file_lines = 0
+        if path is not None:
+            self.load()
+
+    def add(self, language, difficulty, time_taken):
+        if not self.push(language, difficulty, time_taken):
+            return False
+        if self.path is not None:
+            self.append(language, difficulty, time_taken)
+        return True
+
+    def push(self, language, difficulty, time_taken):
+        heap = self.heaps.setdefault((language, difficulty), [])
+        if len(heap) < self.limit:
+            heapq.heappush(heap, -time_taken)
+        elif time_taken < -heap[0]:
+            heapq.heapreplace(heap, -time_taken)
+        else:
+            return False
+        return True
+
+    def top(self, language, difficulty):
+        return sorted(-t for t in self.heaps.get((language, difficulty), []))
+
+    def count(self):
+        return sum(len(heap) for heap in self.heaps.values())
+
+    def load(self):
+        truncated = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as records_file:
+                for line in records_file:
+                    self.file_lines += 1
+                    truncated = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                        self.push(record["language"], record["difficulty"], float(record["time"]))
+                    except (ValueError, KeyError, TypeError):
+                        # Linha incompleta de uma escrita interrompida
+                        continue
+        except OSError:
+            return
+
+        if truncated or self.file_lines > 2 * self.count():
+            self.compact()
+
+    def append(self, language, difficulty, time_taken):
+        line = json.dumps({"language": language, "difficulty": difficulty, "time": time_taken},
+                          ensure_ascii=False) + "\n"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as records_file:
+                records_file.write(line)
+                records_file.flush()
+                os.fsync(records_file.fileno())
+        except OSError:
+            return
+
+        self.file_lines += 1
+        if self.file_lines > 2 * self.count():
+            self.compact()
+
+    def compact(self):
+        temporary_path = self.path + ".tmp"
+        lines = 0
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as records_file:
+                for (language, difficulty), heap in self.heaps.items():
+                    for time_taken in sorted(-t for t in heap):
+                        record = {"language": language, "difficulty": difficulty, "time": time_taken}
+                        records_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        lines += 1
+                records_file.flush()
+                os.fsync(records_file.fileno())
+            os.replace(temporary_path, self.path)
+        except OSError:
+            return
+
+        self.file_lines = lines
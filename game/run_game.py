@@ -3,6 +3,7 @@
 Script de instalação e execução do Sequence Alignment Game
 """
 
+import argparse
 import subprocess
 import sys
 import os
@@ -28,30 +29,56 @@ def install_pygame():
         print("✗ Erro ao instalar pygame")
         return False
 
-def run_demo():
+def warm_up():
+    """Importa o jogo e a demonstração uma única vez, no próprio processo"""
+    import core
+    import example
+    return core, example
+
+def run_demo(isolated=False):
     """Executa a demonstração do algoritmo"""
     print("\n" + "="*50)
     print("EXECUTANDO DEMONSTRAÇÃO DO ALGORITMO")
     print("="*50)
     
-    try:
-        subprocess.run([sys.executable, "example.py"])
-    except FileNotFoundError:
-        print("✗ Arquivo example.py não encontrado")
+    if isolated:
+        try:
+            subprocess.run([sys.executable, "example.py"])
+        except FileNotFoundError:
+            print("✗ Arquivo example.py não encontrado")
+        return
+    
+    _, example = warm_up()
+    example.demonstrate_sequence_alignment()
+    example.test_algorithm_correctness()
+    example.show_available_phrases()
 
-def run_game():
+def run_game(isolated=False):
     """Executa o jogo principal"""
     print("\n" + "="*50)
     print("INICIANDO O SEQUENCE ALIGNMENT GAME")
     print("="*50)
     
-    try:
-        subprocess.run([sys.executable, "main.py"])
-    except FileNotFoundError:
-        print("✗ Arquivo main.py não encontrado")
+    if isolated:
+        try:
+            subprocess.run([sys.executable, "main.py"])
+        except FileNotFoundError:
+            print("✗ Arquivo main.py não encontrado")
+        return
+    
+    # A janela, as fontes e os blocos renderizados continuam vivos entre
+    # uma partida e outra; cada sessão recomeça na escolha de idioma.
+    core, _ = warm_up()
+    core.game_state.change_language()
+    core.game_loop(keep_display=True)
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Instalador e menu do Sequence Alignment Game")
+    parser.add_argument("--isolated", action="store_true",
+                        help="executa o jogo e a demonstração em processos separados")
+    args = parser.parse_args()
+    
     print("SEQUENCE ALIGNMENT GAME - INSTALADOR")
     print("="*50)
     
@@ -61,6 +88,9 @@ def main():
             print("Não foi possível instalar o pygame. Saindo...")
             return
     
+    if not args.isolated:
+        warm_up()
+    
     # Menu de opções
     while True:
         print("\nOpções:")
@@ -71,10 +101,13 @@ def main():
         choice = input("\nEscolha uma opção (1-3): ").strip()
         
         if choice == "1":
-            run_demo()
+            run_demo(args.isolated)
         elif choice == "2":
-            run_game()
+            run_game(args.isolated)
         elif choice == "3":
+            if not args.isolated:
+                core, _ = warm_up()
+                core.shutdown_display()
             print("Obrigado por usar o Sequence Alignment Game!")
             break
         else:
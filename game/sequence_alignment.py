@@ -1,10 +1,75 @@
 import random
+from collections import namedtuple
 
-def levenshtein_distance(str1, str2):
+FEEDBACK_THRESHOLDS = (0.9, 0.7, 0.5, 0.3)
+
+FEEDBACK_KEYS = {
+    1.0: "perfect",
+    0.9: "excellent",
+    0.7: "very_good",
+    0.5: "good",
+    0.3: "keep_trying",
+    0.0: "can_do_better"
+}
+
+FEEDBACK_MESSAGES = {
+    "perfect": "Perfeito! Frase correta!",
+    "excellent": "Excelente! {distance} erro(s) restante(s)",
+    "very_good": "Muito bom! {distance} erro(s) para corrigir",
+    "good": "Bom progresso! {distance} erro(s) encontrado(s)",
+    "keep_trying": "Continue tentando! {distance} erro(s) para corrigir",
+    "can_do_better": "Você pode fazer melhor! {distance} erro(s) encontrado(s)"
+}
+
+class AlignmentResult(namedtuple("AlignmentResult", ["distance", "similarity", "bucket", "message_key"])):
+    __slots__ = ()
+    
+    @property
+    def message(self):
+        return FEEDBACK_MESSAGES[self.message_key].format(distance=_format_distance(self.distance))
+
+def _format_distance(distance):
+    # Motores de alinhamento com pesos dão distâncias fracionárias
+    if distance == int(distance):
+        return str(int(distance))
+    return f"{distance:.2f}".rstrip("0").replace(".", ",")
+
+def levenshtein_distance(str1, str2, max_distance=None):
+    # Mantém apenas duas linhas da matriz de programação dinâmica.
+    # Com max_distance, só a faixa diagonal |i - j| <= max_distance é
+    # calculada (Ukkonen) e o retorno é max_distance + 1 se o limite
+    # for ultrapassado.
+    if max_distance is not None:
+        return _bounded_levenshtein(str1, str2, max_distance)
+    
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
     m, n = len(str1), len(str2)
     
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    previous = list(range(n + 1))
+    current = [0] * (n + 1)
     
+    for i in range(1, m + 1):
+        current[0] = i
+        char1 = str1[i - 1]
+        for j in range(1, n + 1):
+            if char1 == str2[j - 1]:
+                current[j] = previous[j - 1]
+            else:
+                current[j] = 1 + min(
+                    previous[j],
+                    current[j - 1],
+                    previous[j - 1]
+                )
+        previous, current = current, previous
+    
+    return previous[n]
+
+def reference_distance(str1, str2):
+    # Matriz completa, sem nenhuma otimização: é a referência contra a
+    # qual os motores de DISTANCE_ENGINES são comparados.
+    m, n = len(str1), len(str2)
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
     for i in range(m + 1):
         dp[i][0] = i
     for j in range(n + 1):
@@ -12,47 +77,665 @@ def levenshtein_distance(str1, str2):
     
     for i in range(1, m + 1):
         for j in range(1, n + 1):
-            if str1[i - 1] == str2[j - 1]:
-                dp[i][j] = dp[i - 1][j - 1]
+            cost = 0 if str1[i - 1] == str2[j - 1] else 1
+            dp[i][j] = min(
+                dp[i - 1][j] + 1,
+                dp[i][j - 1] + 1,
+                dp[i - 1][j - 1] + cost
+            )
+    
+    return dp[m][n]
+
+def osa_distance(str1, str2):
+    # Alinhamento ótimo restrito (OSA): Levenshtein mais a troca de duas
+    # letras vizinhas com custo 1. A transposição só olha duas linhas
+    # para trás, então bastam três linhas da matriz.
+    m, n = len(str1), len(str2)
+    two_back = [0] * (n + 1)
+    previous = list(range(n + 1))
+    current = [0] * (n + 1)
+    
+    for i in range(1, m + 1):
+        current[0] = i
+        char1 = str1[i - 1]
+        before1 = str1[i - 2] if i > 1 else None
+        for j in range(1, n + 1):
+            char2 = str2[j - 1]
+            if char1 == char2:
+                value = previous[j - 1]
             else:
-                dp[i][j] = 1 + min(
-                    dp[i - 1][j],
-                    dp[i][j - 1],
-                    dp[i - 1][j - 1]
+                value = 1 + min(
+                    previous[j],
+                    current[j - 1],
+                    previous[j - 1]
                 )
+                if j > 1 and char1 == str2[j - 2] and before1 == char2 and two_back[j - 2] + 1 < value:
+                    value = two_back[j - 2] + 1
+            current[j] = value
+        two_back, previous, current = previous, current, two_back
     
-    return dp[m][n]
+    return previous[n]
+
+def damerau_distance(str1, str2):
+    # Damerau-Levenshtein verdadeira (Lowrance-Wagner): letras já
+    # transpostas ainda podem ser editadas. A transposição pode voltar
+    # até a última linha em que a letra apareceu, então aqui a matriz é
+    # completa; last_row guarda essa linha para cada letra.
+    m, n = len(str1), len(str2)
+    infinity = m + n
+    dp = [[infinity] * (n + 2) for _ in range(m + 2)]
+    for i in range(m + 1):
+        dp[i + 1][1] = i
+    for j in range(n + 1):
+        dp[1][j + 1] = j
+    
+    last_row = {}
+    for i in range(1, m + 1):
+        char1 = str1[i - 1]
+        last_column = 0
+        for j in range(1, n + 1):
+            char2 = str2[j - 1]
+            k = last_row.get(char2, 0)
+            l = last_column
+            if char1 == char2:
+                cost = 0
+                last_column = j
+            else:
+                cost = 1
+            dp[i + 1][j + 1] = min(
+                dp[i][j] + cost,
+                dp[i + 1][j] + 1,
+                dp[i][j + 1] + 1,
+                dp[k][l] + (i - k - 1) + 1 + (j - l - 1)
+            )
+        last_row[char1] = i
+    
+    return dp[m + 1][n + 1]
+
+class PreparedTarget:
+    # Frase alvo pré-codificada para o núcleo bit-paralelo de Myers/Hyyrö.
+    # Cada caractere (qualquer ponto de código, incluindo "ç", "ã", "î")
+    # recebe uma máscara com os bits das posições onde aparece no alvo.
+    # As máscaras são inteiros do Python, que já operam em várias
+    # palavras de máquina quando o alvo passa de 64 caracteres, então
+    # cada caractere da frase atual custa O(ceil(m / w)).
+    __slots__ = ("text", "length", "masks", "full_mask", "high_bit")
+    metric = "levenshtein"
+    
+    def __init__(self, text):
+        self.text = text
+        self.length = len(text)
+        self.masks = {}
+        for i, char in enumerate(text):
+            self.masks[char] = self.masks.get(char, 0) | (1 << i)
+        self.full_mask = (1 << self.length) - 1
+        self.high_bit = 1 << (self.length - 1) if self.length else 0
+    
+    def __repr__(self):
+        return f"PreparedTarget({self.text!r})"
+    
+    def similarity(self, current, distance):
+        return _similarity_from_distance(self.text, current, distance)
+    
+    def initial_state(self):
+        # (bits positivos, bits negativos, distância) antes de qualquer caractere
+        return (self.full_mask, 0, self.length)
+    
+    def distance(self, current):
+        if not self.length:
+            return len(current)
+        return self.advance(self.initial_state(), current)[2]
+    
+    def advance(self, state, current, states=None):
+        # Processa os caracteres de current a partir de state; se states
+        # for uma lista, o estado após cada caractere é anexado a ela.
+        positive, negative, score = state
+        if not self.length:
+            for _ in current:
+                score += 1
+                if states is not None:
+                    states.append((positive, negative, score))
+            return (positive, negative, score)
+        
+        masks = self.masks
+        full_mask = self.full_mask
+        high_bit = self.high_bit
+        
+        for char in current:
+            eq = masks.get(char, 0)
+            vertical = eq | negative
+            horizontal = (((eq & positive) + positive) ^ positive) | eq
+            horizontal_positive = negative | ~(horizontal | positive)
+            horizontal_negative = positive & horizontal
+            
+            if horizontal_positive & high_bit:
+                score += 1
+            elif horizontal_negative & high_bit:
+                score -= 1
+            
+            horizontal_positive = (horizontal_positive << 1) | 1
+            horizontal_negative <<= 1
+            positive = (horizontal_negative | ~(vertical | horizontal_positive)) & full_mask
+            negative = horizontal_positive & vertical & full_mask
+            if states is not None:
+                states.append((positive, negative, score))
+        
+        return (positive, negative, score)
+
+class PreparedOSATarget(PreparedTarget):
+    # Núcleo bit-paralelo de Hyyrö para OSA: os bits de transposição vêm
+    # da coluna anterior, ((~D0' & Eq) << 1) & Eq', então o estado também
+    # guarda D0 e a máscara do caractere anterior.
+    __slots__ = ()
+    metric = "osa"
+    
+    def __repr__(self):
+        return f"PreparedOSATarget({self.text!r})"
+    
+    def initial_state(self):
+        return (self.full_mask, 0, self.length, 0, 0)
+    
+    def distance(self, current):
+        if not self.length:
+            return len(current)
+        return self.advance(self.initial_state(), current)[2]
+    
+    def advance(self, state, current, states=None):
+        positive, negative, score, diagonal, previous_eq = state
+        if not self.length:
+            for _ in current:
+                score += 1
+                if states is not None:
+                    states.append((positive, negative, score, diagonal, previous_eq))
+            return (positive, negative, score, diagonal, previous_eq)
+        
+        masks = self.masks
+        full_mask = self.full_mask
+        high_bit = self.high_bit
+        
+        for char in current:
+            eq = masks.get(char, 0)
+            transposition = (((~diagonal) & eq) << 1) & previous_eq
+            diagonal = (((eq & positive) + positive) ^ positive) | eq | negative | transposition
+            horizontal_positive = negative | ~(diagonal | positive)
+            horizontal_negative = positive & diagonal
+            
+            if horizontal_positive & high_bit:
+                score += 1
+            elif horizontal_negative & high_bit:
+                score -= 1
+            
+            horizontal_positive = (horizontal_positive << 1) | 1
+            horizontal_negative <<= 1
+            positive = (horizontal_negative | ~(diagonal | horizontal_positive)) & full_mask
+            negative = horizontal_positive & diagonal & full_mask
+            previous_eq = eq
+            if states is not None:
+                states.append((positive, negative, score, diagonal, previous_eq))
+        
+        return (positive, negative, score, diagonal, previous_eq)
+
+class ScalarTarget:
+    # Métricas sem núcleo bit-paralelo (Damerau-Levenshtein). O estado
+    # guarda o prefixo já visto em vez de bits, então o IncrementalScorer
+    # funciona igual, mas cada atualização recalcula a distância inteira.
+    # similarity_function converte a distância na similaridade da métrica
+    # (um motor de alinhamento local divide pelo tamanho do alvo).
+    __slots__ = ("text", "length", "metric", "function", "similarity_function")
+    
+    def __init__(self, text, metric, function, similarity_function=None):
+        self.text = text
+        self.length = len(text)
+        self.metric = metric
+        self.function = function
+        self.similarity_function = similarity_function or _similarity_from_distance
+    
+    def __repr__(self):
+        return f"ScalarTarget({self.text!r}, {self.metric!r})"
+    
+    def similarity(self, current, distance):
+        return self.similarity_function(self.text, current, distance)
+    
+    def initial_state(self):
+        return ("", None, self.length)
+    
+    def distance(self, current):
+        return self.function(self.text, current)
+    
+    def advance(self, state, current, states=None):
+        prefix = state[0]
+        if states is not None:
+            for i in range(1, len(current)):
+                states.append((prefix + current[:i], None, None))
+        prefix += current
+        final_state = (prefix, None, self.function(self.text, prefix))
+        if states is not None and current:
+            states.append(final_state)
+        return final_state
+
+class IncrementalScorer:
+    # Mantém o estado do núcleo bit-paralelo após cada prefixo da frase
+    # atual. Quando a frase muda a partir da posição k, os k primeiros
+    # estados são reaproveitados e só as colunas seguintes são
+    # recalculadas; k = 0 é o recálculo completo.
+    def __init__(self, target, metric=None):
+        self.prepared = prepare_target(target, metric)
+        self.current = ""
+        self._states = [self.prepared.initial_state()]
+        self._known_distance = None
+    
+    @property
+    def distance(self):
+        if self._known_distance is not None:
+            return self._known_distance
+        state = self._states[-1]
+        if state[2] is None:
+            # Estado intermediário de ScalarTarget, que só guarda o prefixo
+            state = self._states[-1] = self.prepared.advance(self._states[-2], self.current[-1])
+        return state[2]
+    
+    def reset(self, current, distance):
+        # Frase já pontuada (banco de desafios): os estados por prefixo
+        # só são calculados quando a primeira troca precisar deles.
+        self.current = current
+        self._states = [self.prepared.initial_state()]
+        self._known_distance = distance
+    
+    def _compute_states(self, end):
+        computed = len(self._states) - 1
+        if computed < end:
+            self.prepared.advance(self._states[-1], self.current[computed:end], self._states)
+    
+    def update(self, current, start=None):
+        if start is None:
+            start = _common_prefix_length(self.current, current)
+        start = max(0, min(start, len(self.current), len(current)))
+        
+        self._compute_states(start)
+        del self._states[start + 1:]
+        self.prepared.advance(self._states[-1], current[start:], self._states)
+        self.current = current
+        self._known_distance = None
+        return self.distance
+    
+    def push(self, char):
+        # Um caractere digitado no fim: só uma coluna nova, O(m / w) no
+        # núcleo bit-paralelo (ScalarTarget recalcula a distância inteira)
+        self._compute_states(len(self.current))
+        self.prepared.advance(self._states[-1], char, self._states)
+        self.current += char
+        self._known_distance = None
+        return self.distance
+    
+    def pop(self):
+        # Apaga o último caractere: a coluna anterior já está guardada
+        if not self.current:
+            return self.distance
+        self._compute_states(len(self.current))
+        self._states.pop()
+        self.current = self.current[:-1]
+        self._known_distance = None
+        return self.distance
+    
+    def result(self):
+        return _result_from_distance(self.prepared, self.current, self.distance)
+
+def _common_prefix_length(str1, str2):
+    length = 0
+    for char1, char2 in zip(str1, str2):
+        if char1 != char2:
+            break
+        length += 1
+    return length
+
+def prepare_target(target, metric=None):
+    # metric=None mantém a métrica de um alvo já preparado (ou usa
+    # Levenshtein); metric é um nome de METRICS ou um motor de alinhamento
+    if isinstance(target, (PreparedTarget, ScalarTarget)):
+        if metric is None or metric == target.metric:
+            return target
+        target = target.text
+    if metric is None or isinstance(metric, str):
+        return METRICS[metric or "levenshtein"].prepare(target)
+    # Objeto com a mesma interface de Metric (alignment_engine.AlignmentEngine)
+    return metric.prepare(target)
+
+def _bounded_levenshtein(str1, str2, max_distance):
+    m, n = len(str1), len(str2)
+    exceeded = max_distance + 1
+    if max_distance < 0 or abs(m - n) > max_distance:
+        return exceeded
+    
+    previous = [j if j <= max_distance else exceeded for j in range(n + 1)]
+    current = [exceeded] * (n + 1)
+    
+    for i in range(1, m + 1):
+        low = max(1, i - max_distance)
+        high = min(n, i + max_distance)
+        
+        current[0] = i if i <= max_distance else exceeded
+        if low > 1:
+            current[low - 1] = exceeded
+        
+        row_min = current[0]
+        char1 = str1[i - 1]
+        for j in range(low, high + 1):
+            if char1 == str2[j - 1]:
+                value = previous[j - 1]
+            else:
+                value = 1 + min(
+                    previous[j],
+                    current[j - 1],
+                    previous[j - 1]
+                )
+                if value > exceeded:
+                    value = exceeded
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        
+        if high < n:
+            current[high + 1] = exceeded
+        
+        if row_min > max_distance:
+            return exceeded
+        previous, current = current, previous
+    
+    return min(previous[n], exceeded)
+
+def _bucket_for(similarity):
+    if similarity == 1.0:
+        return 1.0
+    for threshold in FEEDBACK_THRESHOLDS:
+        if similarity >= threshold:
+            return threshold
+    return 0.0
 
-def calculate_similarity(str1, str2):
+def _similarity_from_distance(str1, str2, distance):
     if not str1 and not str2:
         return 1.0
     if not str1 or not str2:
         return 0.0
     
-    distance = levenshtein_distance(str1, str2)
     max_length = max(len(str1), len(str2))
-    similarity = 1 - (distance / max_length)
-    return similarity
+    return 1 - (distance / max_length)
+
+def _result_from_distance(prepared, current, distance):
+    # A similaridade vem do alvo preparado, que conhece a escala da métrica
+    similarity = prepared.similarity(current, distance)
+    bucket = _bucket_for(similarity)
+    return AlignmentResult(distance, similarity, bucket, FEEDBACK_KEYS[bucket])
+
+def score_alignment(target, current, metric=None):
+    # Ponto único de pontuação: uma execução do núcleo bit-paralelo
+    # produz distância, similaridade, faixa e chave da mensagem.
+    # target pode ser uma string ou um alvo preparado reaproveitado.
+    prepared = prepare_target(target, metric)
+    return _result_from_distance(prepared, current, prepared.distance(current))
+
+def calculate_similarity(str1, str2, metric=None):
+    return score_alignment(str1, str2, metric).similarity
 
-def get_feedback(target, current):
-    similarity = calculate_similarity(target, current)
-    distance = levenshtein_distance(target, current)
+def get_feedback(target, current, metric=None):
+    result = score_alignment(target, current, metric)
+    return result.message, result.similarity, result.distance
+
+def _encode(text):
+    import numpy as np
     
-    if similarity == 1.0:
-        return "Perfeito! Frase correta!", similarity, distance
-    
-    if similarity >= 0.9:
-        return f"Excelente! {distance} erro(s) restante(s)", similarity, distance
-    elif similarity >= 0.7:
-        return f"Muito bom! {distance} erro(s) para corrigir", similarity, distance
-    elif similarity >= 0.5:
-        return f"Bom progresso! {distance} erro(s) encontrado(s)", similarity, distance
-    elif similarity >= 0.3:
-        return f"Continue tentando! {distance} erro(s) para corrigir", similarity, distance
-    else:
-        return f"Você pode fazer melhor! {distance} erro(s) encontrado(s)", similarity, distance
-
-def shuffle_string(text, difficulty=0.5):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int32)
+
+def _advance_columns(columns, chars, target_codes, offsets, two_back=None, previous_chars=None):
+    # Uma coluna da programação dinâmica para cada linha de columns, cada
+    # uma com o seu caractere; a dependência vertical vira um mínimo
+    # acumulado: dp[i] = i + min(t[k] - k) para k <= i. Com two_back (a
+    # coluna de dois passos atrás) entra também a transposição do OSA,
+    # que não depende da coluna atual e por isso vem antes do mínimo.
+    import numpy as np
+    
+    cost = chars[:, None] != target_codes[None, :]
+    next_columns = np.empty_like(columns)
+    next_columns[:, 0] = columns[:, 0] + 1
+    np.minimum(columns[:, 1:] + 1, columns[:, :-1] + cost, out=next_columns[:, 1:])
+    if two_back is not None and target_codes.size > 1:
+        swapped = ((chars[:, None] == target_codes[None, :-1])
+                   & (previous_chars[:, None] == target_codes[None, 1:]))
+        transposition = np.where(swapped, two_back[:, :-2] + 1, next_columns[:, 2:])
+        np.minimum(next_columns[:, 2:], transposition, out=next_columns[:, 2:])
+    next_columns -= offsets
+    np.minimum.accumulate(next_columns, axis=1, out=next_columns)
+    next_columns += offsets
+    return next_columns
+
+def _prefix_columns(codes, target_codes, offsets):
+    # Colunas após cada prefixo de codes: linha k = codes[:k] contra o alvo
+    import numpy as np
+    
+    columns = np.empty((codes.size + 1, target_codes.size + 1), dtype=np.int32)
+    columns[0] = offsets
+    for k in range(codes.size):
+        columns[k + 1] = _advance_columns(columns[k, None], codes[k, None], target_codes, offsets)[0]
+    return columns
+
+def batch_distance(target, candidates, metric=None):
+    # Compara um alvo com vários candidatos de uma vez usando NumPy.
+    # Os candidatos viram uma matriz de pontos de código preenchida com
+    # -1; cada iteração calcula uma coluna da programação dinâmica para
+    # todo o lote. metric pode ser "levenshtein" ou "osa" (a transposição
+    # usa a coluna de dois passos atrás). Retorna (distâncias,
+    # similaridades) iguais às versões escalares.
+    import numpy as np
+    
+    if isinstance(target, (PreparedTarget, ScalarTarget)):
+        metric = metric or target.metric
+        target = target.text
+    metric = metric or "levenshtein"
+    if metric not in ("levenshtein", "osa"):
+        raise ValueError(f"batch_distance não suporta a métrica {metric!r}")
+    candidates = list(candidates)
+    count = len(candidates)
+    m = len(target)
+    
+    lengths = np.fromiter(map(len, candidates), dtype=np.int64, count=count)
+    width = int(lengths.max()) if count else 0
+    
+    codes = np.full((count, width), -1, dtype=np.int32)
+    if width:
+        flat = _encode("".join(candidates))
+        rows = np.repeat(np.arange(count), lengths)
+        starts = np.cumsum(lengths) - lengths
+        columns = np.arange(flat.size) - np.repeat(starts, lengths)
+        codes[rows, columns] = flat
+    target_codes = _encode(target)
+    
+    offsets = np.arange(m + 1, dtype=np.int32)
+    column = np.repeat(offsets[None, :], count, axis=0)
+    last_row = np.empty((count, width + 1), dtype=np.int32)
+    last_row[:, 0] = m
+    
+    two_back = None
+    for j in range(1, width + 1):
+        if metric == "osa" and j > 1:
+            next_column = _advance_columns(column, codes[:, j - 1], target_codes, offsets,
+                                           two_back, codes[:, j - 2])
+        else:
+            next_column = _advance_columns(column, codes[:, j - 1], target_codes, offsets)
+        two_back, column = column, next_column
+        last_row[:, j] = column[:, m]
+    
+    distances = last_row[np.arange(count), lengths]
+    
+    max_lengths = np.maximum(lengths, m)
+    similarities = np.ones(count, dtype=np.float64)
+    nonempty = max_lengths > 0
+    similarities[nonempty] = 1 - (distances[nonempty] / max_lengths[nonempty])
+    similarities[nonempty & ((lengths == 0) | (m == 0))] = 0.0
+    
+    return distances, similarities
+
+def score_all_swaps(target, current):
+    # Distância resultante de cada troca (i, j), i < j, de current, sem
+    # as trocas de letras iguais. Com F[k] a coluna após current[:k] e
+    # B[k][r] = distância(target[r:], current[k:]), a troca (i, j) vale
+    # min(C + B[j + 1]), onde C parte de F[i] e processa current[j],
+    # current[i + 1:j] e current[i]. As trocas são agrupadas pela letra
+    # levada para a posição i e todos os grupos avançam juntos numa só
+    # matriz: a cada passo d são pontuadas as trocas (i, i + d).
+    # Retorna uma matriz (k, 3) de (i, j, nova distância) ordenada pela
+    # distância e depois por i e j. Só Levenshtein: a divisão em prefixo e
+    # sufixo não vale para uma transposição que cruza o ponto de corte.
+    import numpy as np
+    
+    if isinstance(target, (PreparedTarget, ScalarTarget)):
+        if target.metric != "levenshtein":
+            raise ValueError(f"score_all_swaps não suporta a métrica {target.metric!r}")
+        target = target.text
+    n, m = len(current), len(target)
+    codes = _encode(current)
+    target_codes = _encode(target)
+    offsets = np.arange(m + 1, dtype=np.int32)
+    
+    forward = _prefix_columns(codes, target_codes, offsets)
+    backward = _prefix_columns(codes[::-1], target_codes[::-1], offsets)[::-1, ::-1]
+    
+    # Uma linha por par (i, letra levada para i); as linhas de todas as
+    # letras avançam juntas, ordenadas por i
+    rows = []
+    chars = []
+    for char in np.unique(codes):
+        last = np.flatnonzero(codes == char)[-1]
+        starts = np.flatnonzero((codes != char) & (np.arange(n) < last))
+        rows.append(starts)
+        chars.append(np.full(starts.size, char, dtype=np.int32))
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    chars = np.concatenate(chars) if chars else np.empty(0, dtype=np.int32)
+    order = np.argsort(rows, kind="stable")
+    rows, chars = rows[order], chars[order]
+    
+    found = []
+    if rows.size:
+        columns = _advance_columns(forward[rows], chars, target_codes, offsets)
+        for d in range(1, n - int(rows[0])):
+            # rows é crescente, então as linhas com i + d < n são um prefixo
+            active = np.searchsorted(rows, n - d)
+            rows, chars, columns = rows[:active], chars[:active], columns[:active]
+            
+            j = rows + d
+            hits = np.flatnonzero(codes[j] == chars)
+            if hits.size:
+                closed = _advance_columns(columns[hits], codes[rows[hits]], target_codes, offsets)
+                distances = (closed + backward[j[hits] + 1]).min(axis=1)
+                found.append(np.stack([rows[hits], j[hits], distances], axis=1).astype(np.int64))
+            
+            columns = _advance_columns(columns, codes[j], target_codes, offsets)
+    
+    if not found:
+        return np.empty((0, 3), dtype=np.int64)
+    swaps = np.concatenate(found)
+    return swaps[np.lexsort((swaps[:, 1], swaps[:, 0], swaps[:, 2]))]
+
+EditOperation = namedtuple("EditOperation", ["kind", "target_index", "current_index"])
+
+# Script de edição de Levenshtein que leva target a current:
+#   match      - target[i] == current[j]
+#   substitute - target[i] trocado por current[j]
+#   insert     - current[j] sobra (target_index é None)
+#   delete     - target[i] falta (current_index é None)
+# Hirschberg: current é dividido ao meio e o ponto de corte em target é
+# o que minimiza a soma da coluna de Myers da metade da esquerda com a da
+# metade da direita invertida. Só duas colunas vivem ao mesmo tempo, então
+# a memória é O(m + n) e o tempo continua O(m * n / w).
+
+def _column_costs(text, current):
+    # Coluna D[i] = distância(text[:i], current) para i = 0..len(text)
+    prepared = PreparedTarget(text)
+    positive, negative, _ = prepared.advance(prepared.initial_state(), current)
+    costs = [len(current)]
+    for i in range(prepared.length):
+        bit = 1 << i
+        costs.append(costs[-1] + (1 if positive & bit else -1 if negative & bit else 0))
+    return costs
+
+def _align_single(target, char, target_offset, current_offset, script):
+    # current com um caractere: casa com a primeira ocorrência em target
+    # ou substitui o primeiro caractere; o resto de target é removido
+    position = target.find(char)
+    kind = "match" if position >= 0 else "substitute"
+    position = max(position, 0)
+    for i in range(len(target)):
+        if i == position:
+            script.append(EditOperation(kind, target_offset + i, current_offset))
+        else:
+            script.append(EditOperation("delete", target_offset + i, None))
+
+def _hirschberg(target, current, target_offset, current_offset, script):
+    if not current:
+        script.extend(EditOperation("delete", target_offset + i, None) for i in range(len(target)))
+        return
+    if not target:
+        script.extend(EditOperation("insert", None, current_offset + j) for j in range(len(current)))
+        return
+    if len(current) == 1:
+        _align_single(target, current, target_offset, current_offset, script)
+        return
+    
+    middle = len(current) // 2
+    left = _column_costs(target, current[:middle])
+    right = _column_costs(target[::-1], current[middle:][::-1])
+    m = len(target)
+    split = min(range(m + 1), key=lambda i: left[i] + right[m - i])
+    
+    _hirschberg(target[:split], current[:middle], target_offset, current_offset, script)
+    _hirschberg(target[split:], current[middle:], target_offset + split, current_offset + middle, script)
+
+def align(target, current):
+    # Lista de EditOperation em ordem; o custo (tudo que não é match) é
+    # levenshtein_distance(target, current)
+    script = []
+    _hirschberg(target, current, 0, 0, script)
+    return script
+
+def _incremental_distance(target, current, metric=None):
+    scorer = IncrementalScorer(target, metric)
+    return scorer.update(current, 0)
+
+# Motores de distância intercambiáveis: recebem (alvo, frase) e devolvem
+# a distância de Levenshtein. bench_kernels.py compara cada um com
+# reference_distance antes de medir, então um motor novo registrado aqui
+# já entra no teste diferencial e no benchmark.
+DISTANCE_ENGINES = {
+    "two_rows": levenshtein_distance,
+    "banded": lambda target, current: _bounded_levenshtein(target, current, max(len(target), len(current))),
+    "bit_parallel": lambda target, current: PreparedTarget(target).distance(current),
+    "incremental": _incremental_distance,
+    "numpy_batch": lambda target, current: int(batch_distance(target, [current])[0][0])
+}
+
+Metric = namedtuple("Metric", ["distance", "prepare", "reference", "engines"])
+
+# Métricas disponíveis. reference é a implementação mais simples de cada
+# uma; engines são as versões rápidas, conferidas contra ela.
+#   levenshtein - inserção, remoção e substituição
+#   osa         - mais a troca de duas letras vizinhas, sem editar de novo
+#                 as letras trocadas (alinhamento ótimo restrito)
+#   damerau     - Damerau-Levenshtein verdadeira, sem essa restrição
+METRICS = {
+    "levenshtein": Metric(levenshtein_distance, PreparedTarget, reference_distance, DISTANCE_ENGINES),
+    "osa": Metric(osa_distance, PreparedOSATarget, osa_distance, {
+        "three_rows": osa_distance,
+        "bit_parallel": lambda target, current: PreparedOSATarget(target).distance(current),
+        "incremental": lambda target, current: _incremental_distance(target, current, "osa"),
+        "numpy_batch": lambda target, current: int(batch_distance(target, [current], "osa")[0][0])
+    }),
+    "damerau": Metric(
+        damerau_distance,
+        lambda text: ScalarTarget(text, "damerau", damerau_distance),
+        damerau_distance,
+        {"incremental": lambda target, current: _incremental_distance(target, current, "damerau")}
+    )
+}
+
+def shuffle_string(text, difficulty=0.5, rng=random):
     if difficulty <= 0:
         return text
     
@@ -62,8 +745,8 @@ def shuffle_string(text, difficulty=0.5):
     num_swaps = int(n * difficulty)
     
     for _ in range(num_swaps):
-        i = random.randint(0, n - 1)
-        j = random.randint(0, n - 1)
+        i = rng.randint(0, n - 1)
+        j = rng.randint(0, n - 1)
         chars[i], chars[j] = chars[j], chars[i]
     
-    return ''.join(chars) 
\ No newline at end of file
+    return ''.join(chars)
\ No newline at end of file
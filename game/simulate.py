@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Benchmark de partidas simuladas do Sequence Alignment Game
+
+Joga milhares de partidas sem janela, pela API real do GameState, num pool
+de processos. Cada partida tem uma semente própria, então as jogadas e os
+resultados são os mesmos com qualquer número de processos. O relatório
+JSON traz partidas por segundo, a distribuição de trocas até a vitória, a
+latência da pontuação por troca e o pico de memória.
+
+Estratégias:
+    random  - troca duas posições quaisquer
+    greedy  - a troca que mais reduz a distância na métrica do nível
+    solver  - a dica do solver, que segue o menor número de trocas
+
+Uso:
+    python simulate.py --games 5000 --strategy greedy --workers 4 --output relatorio.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from batch import chunked, map_chunks, percentile
+from constants import DIFFICULTY_LEVELS, MAX_ATTEMPTS
+from corpus import load_corpus
+from game_logic import GameState
+from sequence_alignment import batch_distance, score_all_swaps
+from solver import min_swaps
+
+def random_strategy(game_state, rng):
+    i, j = rng.sample(range(len(game_state.current_phrase)), 2)
+    return i, j
+
+def swap_distances(prepared, current):
+    """Matriz (k, 3) de (i, j, distância) como score_all_swaps, na métrica de prepared"""
+    if prepared.metric == "levenshtein":
+        return score_all_swaps(prepared, current)
+    # OSA: pontua todas as frases trocadas num só lote
+    import numpy as np
+
+    pairs = [(i, j) for i in range(len(current)) for j in range(i + 1, len(current)) if current[i] != current[j]]
+    candidates = []
+    for i, j in pairs:
+        chars = list(current)
+        chars[i], chars[j] = chars[j], chars[i]
+        candidates.append("".join(chars))
+    if not pairs:
+        return np.empty((0, 3), dtype=np.int64)
+    distances, _ = batch_distance(prepared.text, candidates, prepared.metric)
+    swaps = np.column_stack([np.array(pairs, dtype=np.int64), distances.astype(np.int64)])
+    return swaps[np.lexsort((swaps[:, 1], swaps[:, 0], swaps[:, 2]))]
+
+def greedy_strategy(game_state, rng):
+    swaps = swap_distances(game_state.prepared_target, game_state.current_phrase)
+    if not len(swaps):
+        return random_strategy(game_state, rng)
+    # Sorteia entre as melhores trocas para não repetir um empate para sempre
+    best = swaps[swaps[:, 2] == swaps[0, 2]]
+    i, j, _ = best[rng.randrange(len(best))]
+    return int(i), int(j)
+
+def solver_strategy(game_state, rng):
+    return game_state.request_hint()
+
+STRATEGIES = {
+    "random": random_strategy,
+    "greedy": greedy_strategy,
+    "solver": solver_strategy
+}
+
+def play_game(game_state, strategy, seed, index, max_swaps):
+    """Joga uma partida e retorna (venceu, trocas, mínimo, latências)"""
+    random.seed(f"{seed}:{index}")
+    rng = random.Random(f"{seed}:{index}:jogador")
+    game_state.new_game()
+    optimal = game_state.min_swaps
+    if optimal is None:
+        optimal = min_swaps(game_state.current_phrase, game_state.target_phrase)
+
+    scoring_times = []
+    strategy_times = []
+    while not game_state.game_won and game_state.attempts < max_swaps:
+        start = time.perf_counter()
+        i, j = strategy(game_state, rng)
+        middle = time.perf_counter()
+        game_state.swap_chars(i, j)
+        end = time.perf_counter()
+        strategy_times.append(middle - start)
+        scoring_times.append(end - middle)
+
+    return game_state.game_won, game_state.attempts, optimal, scoring_times, strategy_times
+
+def play_games(indices, config):
+    """Joga um bloco de partidas (roda num processo do pool)"""
+    corpus = load_corpus(config["corpus"])
+    puzzles = None
+    if config["puzzles"]:
+        from puzzles import PuzzleBank
+        puzzles = PuzzleBank(config["puzzles"])
+    game_state = GameState(corpus=corpus, puzzles=puzzles)
+    strategy = STRATEGIES[config["strategy"]]
+    languages = corpus.languages()
+    difficulties = config["difficulties"]
+
+    results = []
+    for index in indices:
+        game_state.language = languages[index % len(languages)]
+        game_state.difficulty = difficulties[index // len(languages) % len(difficulties)]
+        results.append(play_game(game_state, strategy, config["seed"], index, config["max_swaps"]))
+
+    corpus.close()
+    if puzzles is not None:
+        puzzles.close()
+    return results
+
+def run_games(config, games, workers, chunk_size):
+    """Gera os resultados das partidas na ordem dos índices"""
+    for _, results in map_chunks(play_games, chunked(range(games), chunk_size), workers, config):
+        yield from results
+
+def percentiles(values, points=(50, 95, 99)):
+    """Percentis pelo método do posto mais próximo"""
+    values = sorted(values)
+    return {f"p{point}": percentile(values, point) for point in points}
+
+def peak_memory_kb():
+    """Pico de memória residente deste processo e dos processos do pool"""
+    if resource is None:
+        return {"main": None, "workers": None}
+    scale = 1024 if sys.platform == "darwin" else 1
+    return {
+        "main": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+        "workers": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale
+    }
+
+def build_report(config, results, elapsed_time, workers):
+    wins = [swaps for won, swaps, _, _, _ in results if won]
+    excess = [swaps - optimal for won, swaps, optimal, _, _ in results if won]
+    scoring_times = [t * 1e6 for _, _, _, times, _ in results for t in times]
+    strategy_times = [t * 1e6 for _, _, _, _, times in results for t in times]
+    games = len(results)
+
+    return {
+        "config": dict(config, games=games, workers=workers),
+        "games_per_second": games / elapsed_time if elapsed_time > 0 else None,
+        "elapsed_seconds": elapsed_time,
+        "win_rate": len(wins) / games if games else None,
+        "swaps_to_win": {
+            "mean": sum(wins) / len(wins) if wins else None,
+            **percentiles(wins),
+            "histogram": {str(swaps): count for swaps, count in sorted(Counter(wins).items())}
+        },
+        "excess_swaps_mean": sum(excess) / len(excess) if excess else None,
+        "scoring_latency_us": {"swaps": len(scoring_times), **percentiles(scoring_times)},
+        "strategy_latency_us": percentiles(strategy_times),
+        "peak_memory_kb": peak_memory_kb()
+    }
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de partidas simuladas sem janela")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="greedy")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTY_LEVELS),
+                        help="joga só neste nível (padrão: alterna entre todos)")
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--max-swaps", type=int, default=MAX_ATTEMPTS)
+    parser.add_argument("--corpus", help="arquivo gerado por corpus.py (padrão: frases embutidas)")
+    parser.add_argument("--puzzles", help="banco de desafios gerado por puzzles.py")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--output", default="-", help="arquivo JSON do relatório ('-' para stdout)")
+    args = parser.parse_args()
+
+    config = {
+        "strategy": args.strategy,
+        "seed": args.seed,
+        "max_swaps": args.max_swaps,
+        "difficulties": [args.difficulty] if args.difficulty else list(DIFFICULTY_LEVELS),
+        "corpus": args.corpus,
+        "puzzles": args.puzzles
+    }
+
+    start_time = time.perf_counter()
+    results = list(run_games(config, args.games, args.workers, args.chunk_size))
+    elapsed_time = time.perf_counter() - start_time
+
+    report = json.dumps(build_report(config, results, elapsed_time, args.workers),
+                        ensure_ascii=False, indent=2)
+    if args.output == "-":
+        print(report)
+    else:
+        with open(args.output, "w", encoding="utf-8") as report_file:
+            report_file.write(report + "\n")
+        print(f"✓ Relatório de {len(results)} partidas salvo em {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
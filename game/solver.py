@@ -0,0 +1,188 @@
+import time
+from collections import Counter
+
+from constants import HINT_TIME_BUDGET
+
+# Número mínimo de trocas de duas posições para transformar a frase
+# atual na frase alvo. Só posições erradas importam: cada uma é uma
+# aresta (letra atual -> letra desejada) e o mínimo é (posições erradas -
+# maior número de ciclos em que as arestas se dividem). Quando as letras
+# desejadas são todas distintas os ciclos são únicos; com letras
+# repetidas a divisão é buscada com IDA* sobre a contagem de arestas.
+
+# Cada estado visitado custa O(arestas distintas), então o limite da
+# busca conta arestas e não estados: é determinístico (o mesmo resultado
+# em qualquer máquina) e também limita o tempo em frases longas.
+WORK_BUDGET = 100000
+
+class SearchBudgetExceeded(Exception):
+    pass
+
+def _check_permutation(current, target):
+    if len(current) != len(target) or sorted(current) != sorted(target):
+        raise ValueError("a frase atual não é uma permutação da frase alvo")
+
+def mismatched_positions(current, target):
+    return [i for i, (char, wanted) in enumerate(zip(current, target)) if char != wanted]
+
+def _cycle_swaps(current, target, mismatched):
+    destination = {target[i]: i for i in mismatched}
+    visited = set()
+    cycles = 0
+    for start in mismatched:
+        if start in visited:
+            continue
+        cycles += 1
+        position = start
+        while position not in visited:
+            visited.add(position)
+            position = destination[current[position]]
+    return len(mismatched) - cycles
+
+def edge_counts(current, target):
+    return Counter((char, wanted) for char, wanted in zip(current, target) if char != wanted)
+
+def _apply_swap(edges, first, second):
+    # Troca uma posição a->b com uma b->c: a primeira fica certa e a
+    # segunda vira a->c (ou fica certa também, se a == c)
+    edges = Counter(edges)
+    for edge in (first, second):
+        edges[edge] -= 1
+        if not edges[edge]:
+            del edges[edge]
+    if first[0] != second[1]:
+        edges[(first[0], second[1])] += 1
+    return edges
+
+def _take_two_cycles(edges):
+    # Trocas que acertam duas posições estão sempre numa solução ótima
+    edges = Counter(edges)
+    swaps = 0
+    for (a, b) in list(edges):
+        if a < b and (b, a) in edges:
+            pairs = min(edges[(a, b)], edges[(b, a)])
+            swaps += pairs
+            for edge in ((a, b), (b, a)):
+                edges[edge] -= pairs
+                if not edges[edge]:
+                    del edges[edge]
+    return edges, swaps
+
+def _lower_bound(edges):
+    # Sem ciclos de tamanho 2, todo ciclo tem ao menos 3 arestas
+    total = sum(edges.values())
+    return total - total // 3
+
+def _branches(edges):
+    # Fixa a aresta com menos continuações e tenta cada letra seguinte
+    options = {}
+    for (a, b) in edges:
+        options.setdefault(a, set()).add(b)
+    first = min(edges, key=lambda edge: (len(options[edge[1]]), edge))
+    return first, sorted(options[first[1]])
+
+def _greedy_swaps(edges):
+    edges, swaps = _take_two_cycles(edges)
+    while edges:
+        first, following = _branches(edges)
+        edges, forced = _take_two_cycles(_apply_swap(edges, first, (first[1], following[0])))
+        swaps += 1 + forced
+    return swaps
+
+class SwapSearch:
+    # IDA* com tabela de transposição: failed guarda, para cada estado, o
+    # maior número de trocas com que ele já se mostrou insolúvel.
+    def __init__(self, work_budget=WORK_BUDGET, deadline=None):
+        self.work_budget = work_budget
+        self.deadline = deadline
+        self.work = 0
+        self.failed = {}
+
+    def solve(self, edges):
+        edges, forced = _take_two_cycles(edges)
+        if not edges:
+            return forced
+        upper = _greedy_swaps(edges)
+        bound = _lower_bound(edges)
+        while bound < upper:
+            if self._within(edges, bound):
+                return forced + bound
+            bound += 1
+        return forced + upper
+
+    def _within(self, edges, bound):
+        edges, forced = _take_two_cycles(edges)
+        bound -= forced
+        if not edges:
+            return bound >= 0
+        if _lower_bound(edges) > bound:
+            return False
+
+        key = frozenset(edges.items())
+        if self.failed.get(key, -1) >= bound:
+            return False
+
+        self.work += len(edges)
+        if self.work_budget is not None and self.work > self.work_budget:
+            raise SearchBudgetExceeded()
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchBudgetExceeded()
+
+        first, following = _branches(edges)
+        for wanted in following:
+            if self._within(_apply_swap(edges, first, (first[1], wanted)), bound - 1):
+                return True
+
+        self.failed[key] = bound
+        return False
+
+def min_swaps(current, target, work_budget=WORK_BUDGET, time_budget=None):
+    # Exato; só se a busca passar de work_budget devolve o limite
+    # superior guloso. time_budget (segundos) é opcional e deixa o
+    # resultado dependente da velocidade da máquina, por isso o banco de
+    # desafios e as simulações usam só o limite determinístico.
+    _check_permutation(current, target)
+    mismatched = mismatched_positions(current, target)
+    if len({target[i] for i in mismatched}) == len(mismatched):
+        return _cycle_swaps(current, target, mismatched)
+
+    edges = edge_counts(current, target)
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    try:
+        return SwapSearch(work_budget, deadline).solve(edges)
+    except SearchBudgetExceeded:
+        return _greedy_swaps(edges)
+
+def _position_of(current, target, edge, exclude=-1):
+    for i, (char, wanted) in enumerate(zip(current, target)):
+        if i != exclude and (char, wanted) == edge:
+            return i
+
+def best_swap(current, target, time_budget=HINT_TIME_BUDGET):
+    # Dica: uma troca (i, j) que começa uma solução ótima. Se a busca não
+    # terminar dentro de time_budget segundos, devolve a troca gulosa,
+    # que sempre acerta ao menos uma posição. None se já está resolvido.
+    _check_permutation(current, target)
+    edges = edge_counts(current, target)
+    if not edges:
+        return None
+
+    for (a, b) in edges:
+        if (b, a) in edges:
+            first = _position_of(current, target, (a, b))
+            return first, _position_of(current, target, (b, a), first)
+
+    first, following = _branches(edges)
+    best = following[0]
+    search = SwapSearch(None, time.perf_counter() + time_budget)
+    try:
+        best_cost = None
+        for wanted in following:
+            cost = search.solve(_apply_swap(edges, first, (first[1], wanted)))
+            if best_cost is None or cost < best_cost:
+                best, best_cost = wanted, cost
+    except SearchBudgetExceeded:
+        pass
+
+    position = _position_of(current, target, first)
+    return position, _position_of(current, target, (first[1], best), position)
@@ -0,0 +1,24 @@
+import time
+from contextlib import contextmanager
+
+# Tempos das fases de inicialização, na ordem em que aconteceram
+STARTUP_TIMINGS = []
+
+@contextmanager
+def timed(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS.append((phase, time.perf_counter() - start))
+
+def startup_report():
+    total = sum(seconds for _, seconds in STARTUP_TIMINGS)
+    width = max([len(phase) for phase, _ in STARTUP_TIMINGS] + [5])
+    
+    lines = ["Tempo de inicialização:"]
+    for phase, seconds in STARTUP_TIMINGS:
+        share = seconds / total if total else 0.0
+        lines.append(f"  {phase:<{width}}  {seconds * 1000:8.1f} ms  {share:6.1%}")
+    lines.append(f"  {'total':<{width}}  {total * 1000:8.1f} ms")
+    return "\n".join(lines)